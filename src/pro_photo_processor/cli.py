@@ -2,29 +2,77 @@
 CLI entry point for photo post-processing pipeline.
 """
 
+import atexit
+import json
 import os
+import multiprocessing
 import sys
 import logging
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Callable, Mapping, Optional
 import argparse
 import types
+from functools import lru_cache
 
-from .pipeline import ImageProcessingPipeline
 from pro_photo_processor.config import config
-from pro_photo_processor.io import file_operations
-from pro_photo_processor.core import image_processing
-from pro_photo_processor.utils import get_mode_prefix  # noqa: F401
 
+PRESET_DESCRIPTIONS: Mapping[str, str] = types.MappingProxyType(
+    {
+        "portrait_subtle": "Subtle portrait enhancement",
+        "portrait_natural": "Natural look for portraits",
+        "portrait_dramatic": "Dramatic lighting for portraits",
+        "studio_portrait": "Studio-style portrait finish",
+        "overexposed_recovery": "Recover details from overexposed images",
+        "natural_wildlife": "Enhance wildlife/nature shots",
+        "sports_action": "Sharpen and brighten action shots",
+        "enhanced_mode": "General enhancement for all photos",
+    }
+)
+UTILITY_DESCRIPTIONS: Mapping[str, str] = types.MappingProxyType(
+    {
+        "resize_only": "Resize to target resolutions only",
+        "resize_watermark": "Resize and add watermark",
+        "watermark": "Add watermark only",
+    }
+)
+PRESETS: tuple[str, ...] = tuple(PRESET_DESCRIPTIONS)
+UTILITY_MODES: tuple[str, ...] = tuple(UTILITY_DESCRIPTIONS)
+PROCESSING_TYPES: tuple[str, ...] = PRESETS + UTILITY_MODES
+# Rows of the interactive menu; the options never change, so built once
+MENU_TABLE_HEADERS = ("No.", "Name", "Type", "Description")
+MENU_TABLE: tuple[tuple[int, str, str, str], ...] = tuple(
+    [
+        (idx, name, "Preset", PRESET_DESCRIPTIONS[name])
+        for idx, name in enumerate(PRESETS, 1)
+    ]
+    + [
+        (idx, name, "Utility", UTILITY_DESCRIPTIONS[name])
+        for idx, name in enumerate(UTILITY_MODES, len(PRESETS) + 1)
+    ]
+)
+
+
+@lru_cache(maxsize=None)
+def load_tabulate() -> Optional[Callable[..., str]]:
+    """
+    Import the optional tabulate package once, on first use.
+    It is not imported at module level because it adds ~40 ms to CLI startup.
+    Returns None when it is not installed.
+    """
+    try:
+        from tabulate import tabulate
+    except ImportError:
+        return None
+    return tabulate
 
-format_optimizer: types.ModuleType | None
-try:
-    from pro_photo_processor.presets import format_optimizer
-except ImportError:
-    format_optimizer = None
 
 # --- Enhanced Logging Setup ---
+# Handlers live on the package logger, so module loggers created with
+# logging.getLogger(__name__) (e.g. the RAW loaders) reach them too
+package_logger = logging.getLogger("pro_photo_processor")
 logger = logging.getLogger("pro_photo_processor.cli")
+# Background thread that runs the console/file handlers off the hot path
+_log_listener: Optional[QueueListener] = None
 
 
 def setup_logging(
@@ -33,37 +81,62 @@ def setup_logging(
     """
     Set up logging with both console and rotating file handler.
     Log level can be set via argument, environment variable LOG_LEVEL, or defaults to INFO.
-    This function reconfigures the existing logger.
+    This function reconfigures the package logger, so every module logger
+    under pro_photo_processor (and pool worker processes) shares its handlers.
+    Records are queued by the logger and written by a QueueListener thread,
+    so log calls never block on console or disk I/O.
     """
-    if logger.hasHandlers():
-        for h in logger.handlers[:]:
-            logger.removeHandler(h)
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+    for h in package_logger.handlers[:]:
+        package_logger.removeHandler(h)
     env_level = os.environ.get("LOG_LEVEL", "INFO").upper()
     level = (log_level or env_level or "INFO").upper()
     level_value = getattr(logging, level, logging.INFO)
-    logger.setLevel(level_value)
+    package_logger.setLevel(level_value)
     formatter = logging.Formatter(
         "%(asctime)s [%(levelname)s] %(module)s: %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
     )
+    handlers: list[logging.Handler] = []
     ch = logging.StreamHandler()
     ch.setFormatter(formatter)
     ch.setLevel(level_value)
-    logger.addHandler(ch)
+    handlers.append(ch)
     if not log_file:
         log_file = os.path.join(os.getcwd(), "photo_processor.log")
+    file_error = None
     try:
         fh = RotatingFileHandler(
             log_file, maxBytes=2 * 1024 * 1024, backupCount=3, encoding="utf-8"
         )
         fh.setFormatter(formatter)
         fh.setLevel(level_value)
-        logger.addHandler(fh)
+        handlers.append(fh)
     except Exception as e:
-        logger.warning(f"Could not set up file logging: {e}")
+        file_error = e
+    # A process-safe queue: pool workers forked from this process inherit the
+    # handler, and their records reach the same listener thread
+    log_queue: "multiprocessing.Queue[logging.LogRecord]" = multiprocessing.Queue(-1)
+    package_logger.addHandler(QueueHandler(log_queue))
+    _log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+    if file_error is not None:
+        logger.warning(f"Could not set up file logging: {file_error}")
+
 
+def _stop_log_listener() -> None:
+    """Flush queued log records on interpreter exit"""
+    if _log_listener is not None:
+        _log_listener.stop()
 
-def cli_main() -> None:
+
+atexit.register(_stop_log_listener)
+
+
+def cli_main() -> int:
     parser = argparse.ArgumentParser(description="Photo Post-Processing Pipeline CLI")
     parser.add_argument(
         "--version",
@@ -126,30 +199,26 @@ def cli_main() -> None:
         default=None,
         help="Custom preset as JSON string (optional)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes used for a batch (default: number of CPUs)",
+    )
     args = parser.parse_args()
     setup_logging(log_level=args.log_level, log_file=args.log_file)
-    presets = [
-        "portrait_subtle",
-        "portrait_natural",
-        "portrait_dramatic",
-        "studio_portrait",
-        "overexposed_recovery",
-        "natural_wildlife",
-        "sports_action",
-        "enhanced_mode",
-    ]
-    utility_modes = ["resize_only", "resize_watermark", "watermark"]
 
     # --- Validate input and output paths early ---
-    input_path = args.input_path or getattr(
-        config,
-        "DEFAULT_INPUT_PATH",
-        os.path.abspath(os.path.join(os.getcwd(), "input")),
+    # The ./input and ./output fallbacks are only resolved when config has none
+    input_path = (
+        args.input_path
+        or getattr(config, "DEFAULT_INPUT_PATH", None)
+        or os.path.abspath("input")
     )
-    output_path = args.output_path or getattr(
-        config,
-        "DEFAULT_OUTPUT_DIR",
-        os.path.abspath(os.path.join(os.getcwd(), "output")),
+    output_path = (
+        args.output_path
+        or getattr(config, "DEFAULT_OUTPUT_DIR", None)
+        or os.path.abspath("output")
     )
     if not os.path.exists(input_path):
         logger.error(f"❌ Input path does not exist: {input_path}")
@@ -163,61 +232,60 @@ def cli_main() -> None:
             print(f"Error: Could not create output directory: {output_path}\n{e}")
             sys.exit(1)
     if args.list_presets:
-        preset_descriptions = {
-            "portrait_subtle": "Subtle portrait enhancement",
-            "portrait_natural": "Natural look for portraits",
-            "portrait_dramatic": "Dramatic lighting for portraits",
-            "studio_portrait": "Studio-style portrait finish",
-            "overexposed_recovery": "Recover details from overexposed images",
-            "natural_wildlife": "Enhance wildlife/nature shots",
-            "sports_action": "Sharpen and brighten action shots",
-            "enhanced_mode": "General enhancement for all photos",
-        }
         if args.list_presets_format == "json":
-            import json
-
             logger.info(
                 json.dumps(
                     [
                         {"name": k, "description": v}
-                        for k, v in preset_descriptions.items()
+                        for k, v in PRESET_DESCRIPTIONS.items()
                     ],
                     indent=2,
                 )
             )
         elif args.list_presets_format == "table":
-            try:
-                from tabulate import tabulate
-
-                table = [(k, v) for k, v in preset_descriptions.items()]
+            tabulate = load_tabulate()
+            if tabulate is not None:
+                table = [(k, v) for k, v in PRESET_DESCRIPTIONS.items()]
                 logger.info("\n" + tabulate(table, headers=["Preset", "Description"]))
-            except ImportError:
+            else:
                 logger.info("\nPreset               | Description")
                 logger.info(
                     "---------------------|------------------------------------------"
                 )
-                for k, v in preset_descriptions.items():
+                for k, v in PRESET_DESCRIPTIONS.items():
                     logger.info(f"{k:<20} | {v}")
         else:
             logger.info("Available enhancement presets:")
-            for k, v in preset_descriptions.items():
+            for k, v in PRESET_DESCRIPTIONS.items():
                 logger.info(f"  - {k}: {v}")
         sys.exit(0)
     if args.list_modes:
         logger.info("Available utility processing modes:")
-        for m in utility_modes:
+        for m in UTILITY_MODES:
             logger.info(f"  - {m}")
         sys.exit(0)
+
+    # Heavy imports (numpy, cv2, rawpy) are deferred until a batch actually runs,
+    # so --help and --list-* return quickly
+    from .pipeline import ImageProcessingPipeline
+    from pro_photo_processor.io import file_operations
+    from pro_photo_processor.core import image_processing
+
+    format_optimizer: types.ModuleType | None
+    try:
+        from pro_photo_processor.presets import format_optimizer
+    except ImportError:
+        format_optimizer = None
+
     logger.info(f"📥 Input path: {input_path}")
     logger.info(f"📤 Output path: {output_path}")
     logger.info(
         f"📝 Log file: {args.log_file or os.path.join(os.getcwd(), 'photo_processor.log')}"
     )
-    preset_manager = format_optimizer if format_optimizer is not None else None
     config.DEFAULT_OUTPUT_DIR = output_path
     if not args.log_file and output_path:
         log_path = os.path.join(output_path, "photo_processor.log")
-        for h in logger.handlers:
+        for h in _log_listener.handlers if _log_listener is not None else ():
             if isinstance(h, RotatingFileHandler):
                 try:
                     h.baseFilename = log_path
@@ -227,80 +295,55 @@ def cli_main() -> None:
         config=config,
         file_ops=file_operations,
         image_processor=image_processing,
-        preset_manager=preset_manager,
+        preset_manager=format_optimizer,
+        workers=args.workers or os.cpu_count() or 1,
     )
     selected_type = args.type
     # --- Validate selected type if provided ---
-    if selected_type and selected_type not in presets + utility_modes:
+    if selected_type and selected_type not in PROCESSING_TYPES:
         logger.error(f"❌ Invalid processing type: {selected_type}")
         print(f"Error: Invalid processing type: {selected_type}")
-        print(f"Valid types: {', '.join(presets + utility_modes)}")
+        print(f"Valid types: {', '.join(PROCESSING_TYPES)}")
         sys.exit(1)
 
     if not selected_type:
         logger.info("\nSelect a processing type:")
-        options = presets + utility_modes
-        preset_descriptions = {
-            "portrait_subtle": "Subtle portrait enhancement",
-            "portrait_natural": "Natural look for portraits",
-            "portrait_dramatic": "Dramatic lighting for portraits",
-            "studio_portrait": "Studio-style portrait finish",
-            "overexposed_recovery": "Recover details from overexposed images",
-            "natural_wildlife": "Enhance wildlife/nature shots",
-            "sports_action": "Sharpen and brighten action shots",
-            "enhanced_mode": "General enhancement for all photos",
-        }
-        utility_descriptions = {
-            "resize_only": "Resize to target resolutions only",
-            "resize_watermark": "Resize and add watermark",
-            "watermark": "Add watermark only",
-        }
-        menu_table = []
-        for idx, name in enumerate(options, 1):
-            if name in preset_descriptions:
-                desc = preset_descriptions[name]
-                kind = "Preset"
-            else:
-                desc = utility_descriptions.get(name, "Utility mode")
-                kind = "Utility"
-            menu_table.append((idx, name, kind, desc))
-        try:
-            from tabulate import tabulate
-
-            logger.info(
-                "\n"
-                + tabulate(menu_table, headers=["No.", "Name", "Type", "Description"])
-            )
-        except ImportError:
-            logger.info(f"{'No.':<4} {'Name':<20} {'Type':<10} Description")
+        options = PROCESSING_TYPES
+        tabulate = load_tabulate()
+        if tabulate is not None:
+            logger.info("\n" + tabulate(MENU_TABLE, headers=MENU_TABLE_HEADERS))
+        else:
+            logger.info("{:<4} {:<20} {:<10} {}".format(*MENU_TABLE_HEADERS))
             logger.info(f"{'-' * 4} {'-' * 20} {'-' * 10} {'-' * 40}")
-            for row in menu_table:
+            for row in MENU_TABLE:
                 logger.info(f"{row[0]:<4} {row[1]:<20} {row[2]:<10} {row[3]}")
         max_attempts = 3
         attempts = 0
         while attempts < max_attempts:
-            try:
-                choice = int(input("Enter a number: ").strip())
-                if 1 <= choice <= len(options):
-                    selected_type = options[choice - 1]
-                    logger.info(f"Selected processing type: {selected_type}")
-                    break
-                else:
-                    logger.warning(
-                        f"Please enter a number between 1 and {len(options)}."
-                    )
-                    print(f"Please enter a number between 1 and {len(options)}.")
-            except ValueError:
+            print("Enter a number: ", end="", flush=True)
+            line = sys.stdin.readline()
+            if not line:
+                # EOF: stdin is closed or an empty pipe, so no answer can come
+                logger.error("No processing type given on stdin. Use --type.")
+                print("\nError: no input. Pass --type when running non-interactively.")
+                sys.exit(2)
+            choice_str = line.strip()
+            if not choice_str.isdecimal():
                 logger.warning("Invalid input. Please enter a number.")
                 print("Invalid input. Please enter a number.")
+            elif 1 <= int(choice_str) <= len(options):
+                selected_type = options[int(choice_str) - 1]
+                logger.info(f"Selected processing type: {selected_type}")
+                break
+            else:
+                logger.warning(f"Please enter a number between 1 and {len(options)}.")
+                print(f"Please enter a number between 1 and {len(options)}.")
             attempts += 1
         else:
             logger.error("Too many invalid attempts. Exiting.")
             print("Too many invalid attempts. Exiting.")
             sys.exit(2)
     if args.custom:
-        import json
-
         try:
             custom_preset = json.loads(args.custom)
             if not isinstance(custom_preset, dict):
@@ -309,11 +352,12 @@ def cli_main() -> None:
             logger.error(f"❌ Invalid custom preset JSON: {e}")
             sys.exit(1)
         pipeline.process_with_custom_preset(input_path, custom_preset)
-    elif selected_type in utility_modes:
+    elif selected_type in UTILITY_MODES:
         pipeline.process_images(input_path, mode=selected_type)
     else:
         pipeline.process_with_preset(input_path, selected_type)
+    return 0
 
 
 if __name__ == "__main__":
-    cli_main()
+    sys.exit(cli_main())
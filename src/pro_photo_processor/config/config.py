@@ -10,17 +10,8 @@ RESOLUTIONS = {
 }
 
 # File extension configurations
-IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".nef")
-IMAGE_EXTENSIONS_CASE = (
-    ".jpg",
-    ".jpeg",
-    ".png",
-    ".JPG",
-    ".JPEG",
-    ".PNG",
-    ".nef",
-    ".NEF",
-)
+# Lowercase; compare against os.path.splitext(name)[1].lower()
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".nef"})
 
 # Input/Output configuration
 # DEFAULT_INPUT_PATH = r"C:\Users\harit\Downloads\Food-20250629T220226Z-1-001.zip"
@@ -30,6 +21,12 @@ IMAGE_EXTENSIONS_CASE = (
 DEFAULT_INPUT_PATH = r"/mnt/c/Users/harit/Documents/temp/Input Photos"
 DEFAULT_OUTPUT_DIR = r"/mnt/c/Users/harit/Documents/temp/output"
 DEFAULT_JPEG_QUALITY = 90
+# Run libjpeg's extra Huffman-table pass on save: ~2-3% smaller JPEGs at about
+# twice the encode time
+HIGH_COMPRESSION = False
+# Filter for output resizes, any PIL.Image.Resampling name. BICUBIC is ~1.5-2x
+# faster than LANCZOS with little visible difference at 4x+ downscales
+RESAMPLING_FILTER = "LANCZOS"
 
 # Watermark configuration
 DEFAULT_LOGO_PATH = "/mnt/c/Users/harit/Documents/Visual Studio 2022/Demola/photo_post_processing/assets/photographer_logo_original.png"
@@ -57,6 +54,20 @@ PORTRAIT_MODE = True  # Enable portrait-friendly processing
 PRESERVE_SHADOWS = True  # Don't brighten dark areas automatically
 PRESERVE_HIGHLIGHTS = True  # Don't darken bright areas automatically
 
+# Batch processing
+# Peak memory budget per image in flight; caps parallel decodes so a batch
+# with a few huge files (a 14k x 14k TIFF decodes to ~784 MB) cannot OOM
+WORKER_MEMORY_MB = 800
+
+# Decoded RAW cache: re-running a batch reads the demosaiced pixels from disk
+# instead of decoding each RAW again. Least recently used entries are evicted.
+# Off by default: a 24 MP decode is ~70 MB on disk, so enable it (and size
+# RAW_CACHE_MAX_FILES to the batch) only when re-running the same RAWs
+RAW_CACHE_ENABLED = False
+RAW_CACHE_DIR = None  # None = <system temp dir>/pro_photo_cache
+RAW_CACHE_MAX_FILES = 64
+RAW_CACHE_MAX_MB = 2048
+
 # Alternative processing modes
 MODES = {
     "portrait": {
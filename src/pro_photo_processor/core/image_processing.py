@@ -7,39 +7,43 @@ from pro_photo_processor.raw.raw_processing_enhanced import (
     load_image_smart_enhanced,  # noqa: F401
     load_image_basic,  # noqa: F401
 )
+from pro_photo_processor.config import config
 from pro_photo_processor.utils import get_mode_prefix  # noqa: F401
-from pro_photo_processor.presets.photoshop_tools import apply_photoshop_preset  # noqa: F401
+from pro_photo_processor.presets.photoshop_tools import (
+    PhotoshopStyleEnhancer,  # noqa: F401
+    apply_photoshop_preset,  # noqa: F401
+)
+import os
+from functools import lru_cache
 from typing import Tuple
-from PIL import ExifTags, Image, ImageEnhance, ImageStat
+
+import numpy as np
+from PIL import ExifTags, Image, ImageEnhance
 
 
 def fix_image_orientation(img: Image.Image) -> Image.Image:
     """Fix image orientation based on EXIF data only if needed"""
     try:
-        # Get EXIF data
-        exif = img.getexif()
-        if exif is not None:
-            # Find orientation tag
-            for tag, value in exif.items():
-                if tag in ExifTags.TAGS and ExifTags.TAGS[tag] == "Orientation":
-                    # Only apply rotation for specific EXIF values that actually need correction
-                    # Value 1 = normal (no rotation needed)
-                    # Value 3 = 180° rotation needed
-                    # Value 6 = 270° rotation needed
-                    # Value 8 = 90° rotation needed
-
-                    # Only rotate if EXIF explicitly says the image is rotated
-                    if value == 3:
-                        img = img.rotate(180, expand=True)
-                    elif value == 6:
-                        img = img.rotate(270, expand=True)
-                    elif value == 8:
-                        img = img.rotate(90, expand=True)
-                    # For value 1 (normal) or any other value, do nothing
-                    break
+        # Direct lookup of the Orientation tag (0x0112) instead of scanning
+        # every EXIF entry for its name
+        value = img.getexif().get(ExifTags.Base.Orientation)
     except (AttributeError, KeyError, TypeError):
         # If no EXIF data, leave image as-is
-        pass
+        return img
+
+    # Only apply rotation for specific EXIF values that actually need correction
+    # Value 1 = normal (no rotation needed)
+    # Value 3 = 180° rotation needed
+    # Value 6 = 270° rotation needed
+    # Value 8 = 90° rotation needed
+    # Exact quarter turns are pure pixel transposes, no resampling needed
+    if value == 3:
+        img = img.transpose(Image.Transpose.ROTATE_180)
+    elif value == 6:
+        img = img.transpose(Image.Transpose.ROTATE_270)
+    elif value == 8:
+        img = img.transpose(Image.Transpose.ROTATE_90)
+    # For value 1 (normal) or any other value, do nothing
 
     return img
 
@@ -69,6 +73,48 @@ def resize_and_crop(img: Image.Image, target_size: Tuple[int, int]) -> Image.Ima
     return img.crop((left, top, right, bottom))
 
 
+# Logo placement: distance from the bottom-left corner and the faint white
+# backing box drawn behind it
+WATERMARK_PADDING = 20
+WATERMARK_BG_PADDING = 10
+WATERMARK_BG_ALPHA = 2 / 255
+
+
+@lru_cache(maxsize=4)
+def _load_watermark_logo(watermark_path: str) -> Image.Image:
+    """Decode the watermark logo once per process"""
+    return Image.open(watermark_path).convert("RGBA")
+
+
+@lru_cache(maxsize=32)
+def _watermark_layer(
+    watermark_path: str, watermark_width: int, watermark_opacity: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Resize the logo and apply the opacity boost, cached per output width.
+
+    Returns:
+        (rgb, alpha) float32 arrays, alpha in [0, 1].
+    """
+    logo = _load_watermark_logo(watermark_path)
+    watermark_height = int(watermark_width * logo.height / logo.width)
+    layer = np.asarray(
+        logo.resize((watermark_width, watermark_height), Image.Resampling.LANCZOS),
+        dtype=np.float32,
+    )
+    rgb = layer[..., :3]
+    alpha = layer[..., 3]
+    if watermark_opacity < 1.0:
+        # Boost contrast of visible pixels while applying the opacity
+        alpha = np.where(
+            alpha > 0, np.minimum(255, np.floor(alpha * watermark_opacity * 1.2)), 0
+        )
+    alpha = alpha / 255.0
+    rgb.setflags(write=False)
+    alpha.setflags(write=False)
+    return rgb, alpha
+
+
 def add_watermark(
     img: Image.Image, watermark_opacity: float = 0.9, scale_factor: float = 0.15
 ) -> Image.Image:
@@ -79,115 +125,130 @@ def add_watermark(
         watermark_opacity: Opacity of the watermark (0.0 to 1.0)
         scale_factor: Size of watermark relative to image width (0.1 to 0.3)
     """
-    import os
-
-    from pro_photo_processor.config.config import DEFAULT_LOGO_PATH
-
-    # Create a copy to avoid modifying the original
-    watermarked_img = img.copy()
-
     # Load watermark image using config path
     project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    watermark_path = os.path.join(project_root, DEFAULT_LOGO_PATH)
+    watermark_path = os.path.join(project_root, config.DEFAULT_LOGO_PATH)
 
+    # Calculate watermark size based on image dimensions
+    watermark_width = int(img.width * scale_factor)
+    if watermark_width < 1:
+        return img.copy()
     try:
-        watermark = Image.open(watermark_path).convert("RGBA")
+        wm_rgb, wm_alpha = _watermark_layer(
+            watermark_path, watermark_width, watermark_opacity
+        )
     except (FileNotFoundError, IOError) as e:
         print(f"Warning: Could not load watermark image from {watermark_path}: {e}")
-        return watermarked_img
+        return img.copy()
 
-    # Calculate watermark size based on image dimensions
-    img_width, img_height = watermarked_img.size
-    watermark_width = int(img_width * scale_factor)
+    if img.mode != "RGB":
+        # Flatten transparency onto white, as the final output is RGB
+        rgba = img.convert("RGBA")
+        img = Image.new("RGB", rgba.size, (255, 255, 255))
+        img.paste(rgba, mask=rgba.split()[-1])
 
-    # Maintain aspect ratio
-    aspect_ratio = watermark.height / watermark.width
-    watermark_height = int(watermark_width * aspect_ratio)
-
-    # Resize watermark
-    watermark = watermark.resize(
-        (watermark_width, watermark_height), Image.Resampling.LANCZOS
-    )
+    # Create a copy to avoid modifying the original
+    arr = np.array(img)
+    img_height = arr.shape[0]
+    watermark_height, watermark_width = wm_alpha.shape
 
     # Position watermark in bottom LEFT corner with padding
-    padding = 20
-    x = padding  # Left side
-    y = img_height - watermark_height - padding
-
-    # Convert main image to RGBA if needed
-    if watermarked_img.mode != "RGBA":
-        watermarked_img = watermarked_img.convert("RGBA")
-
-    # Create a semi-transparent background for better visibility
-    bg_padding = 10
-    bg_width = watermark_width + (bg_padding * 2)
-    bg_height = watermark_height + (bg_padding * 2)
-
-    # Create a subtle background (white with low opacity)
-    background = Image.new("RGBA", (bg_width, bg_height), (255, 255, 255, 2))
-
-    # Position background
-    bg_x = x - bg_padding
-    bg_y = y - bg_padding
-
-    # Ensure background doesn't go outside image bounds
-    bg_x = max(0, bg_x)
-    bg_y = max(0, bg_y)
+    x = WATERMARK_PADDING
+    y = img_height - watermark_height - WATERMARK_PADDING
+
+    # Only the backing box around the logo is blended; it always contains
+    # the logo, and slicing clips it to the image bounds
+    bg_x = max(0, x - WATERMARK_BG_PADDING)
+    bg_y = max(0, y - WATERMARK_BG_PADDING)
+    region = arr[
+        bg_y : bg_y + watermark_height + 2 * WATERMARK_BG_PADDING,
+        bg_x : bg_x + watermark_width + 2 * WATERMARK_BG_PADDING,
+    ]
+    rgb = region.astype(np.float32)
+
+    # Subtle white background for better visibility. Alpha is tracked as well
+    # because the blend also lowers coverage before flattening onto white.
+    bg_alpha = WATERMARK_BG_ALPHA
+    rgb *= 1 - bg_alpha
+    rgb += 255 * bg_alpha
+    alpha = np.full(rgb.shape[:2], 1 - bg_alpha + bg_alpha * bg_alpha, np.float32)
+
+    # Blend the logo, clipped where it runs past the image edges
+    off_x = x - bg_x
+    off_y = y - bg_y
+    src_y = max(0, -off_y)
+    dst_y = max(0, off_y)
+    rows = min(watermark_height - src_y, rgb.shape[0] - dst_y)
+    cols = min(watermark_width, rgb.shape[1] - off_x)
+    if rows > 0 and cols > 0:
+        a = wm_alpha[src_y : src_y + rows, :cols]
+        dst = rgb[dst_y : dst_y + rows, off_x : off_x + cols]
+        dst *= 1 - a[..., None]
+        dst += wm_rgb[src_y : src_y + rows, :cols] * a[..., None]
+        dst_alpha = alpha[dst_y : dst_y + rows, off_x : off_x + cols]
+        dst_alpha *= 1 - a
+        dst_alpha += a * a
+
+    # Flatten onto white
+    rgb *= alpha[..., None]
+    rgb += 255 * (1 - alpha[..., None])
+    region[...] = np.clip(np.rint(rgb), 0, 255)
+
+    return Image.fromarray(arr)
+
+
+# ITU-R 601-2 luma weights, as used by Image.convert("L")
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114])
+
+
+def _blend_levels(degenerate: float, lut: np.ndarray, factor: float) -> np.ndarray:
+    """
+    ImageEnhance-style blend of each level toward a constant, truncated and
+    clipped the way Image.blend does it (float32 math).
+    """
+    blended = np.float32(degenerate) + np.float32(factor) * (
+        lut.astype(np.float32) - np.float32(degenerate)
+    )
+    result: np.ndarray = np.clip(np.trunc(blended), 0, 255).astype(np.float64)
+    return result
 
-    # Paste background first
-    watermarked_img.paste(background, (bg_x, bg_y), background)
 
-    # Enhance watermark contrast and opacity
-    if watermark_opacity < 1.0:
-        # Create a new image with adjusted opacity but higher visibility
-        watermark_data = []
-        for pixel in list(watermark.getdata()):
-            if len(pixel) == 4:  # RGBA
-                r, g, b, a = pixel
-                if a > 0:  # Only modify non-transparent pixels
-                    # Enhance contrast and apply opacity
-                    new_alpha = min(255, int(a * watermark_opacity * 1.2))
-                    watermark_data.append((r, g, b, new_alpha))
-                else:
-                    watermark_data.append((r, g, b, a))
-            else:  # RGB, add alpha
-                r, g, b = pixel
-                new_alpha = int(255 * watermark_opacity)
-                watermark_data.append((r, g, b, new_alpha))
-
-        watermark.putdata(watermark_data)
-
-    # Paste watermark onto image
-    watermarked_img.paste(watermark, (x, y), watermark)
-
-    # Convert back to RGB
-    rgb_img = Image.new("RGB", watermarked_img.size, (255, 255, 255))
-    rgb_img.paste(watermarked_img, mask=watermarked_img.split()[-1])
-
-    return rgb_img
+@lru_cache(maxsize=32)
+def _gamma_lut(gamma_factor: float) -> np.ndarray:
+    """256-level gamma lookup table, shared (read-only) by every image in a batch"""
+    table = np.floor((np.arange(256) / 255.0) ** gamma_factor * 255)
+    table.flags.writeable = False
+    return table
 
 
 def analyze_and_adjust_lighting(img: Image.Image) -> Image.Image:
     """Analyze image lighting and apply intelligent adjustments"""
-    # Calculate image statistics
-    stat = ImageStat.Stat(img)
+    # One histogram pass serves both the channel statistics and the
+    # exposure checks (ImageStat would build its own histogram again)
+    histogram = np.asarray(img.histogram(), dtype=np.float64).reshape(-1, 256)
+    levels = np.arange(256, dtype=np.float64)
+    counts = histogram.sum(axis=1)
+    channel_means = histogram @ levels / counts
+    channel_vars = histogram @ (levels * levels) / counts - channel_means**2
 
     # Get mean brightness for each channel (R, G, B)
-    mean_brightness = sum(stat.mean) / len(stat.mean)
+    mean_brightness = float(channel_means.mean())
 
     # Get standard deviation (contrast indicator)
-    std_dev = sum(stat.stddev) / len(stat.stddev)
+    std_dev = float(np.sqrt(np.maximum(channel_vars, 0)).mean())
 
-    # Analyze histogram to detect lighting issues
-    histogram = img.histogram()
+    # Exposure is judged on luminance rather than on the red band alone
+    luma_histogram = histogram[0]
+    if len(histogram) >= 3:
+        luma_histogram = np.asarray(img.convert("L").histogram(), dtype=np.float64)
+    total_pixels = img.width * img.height
 
     # Check for underexposure (too many dark pixels)
-    dark_pixels = sum(histogram[0:85])  # Very dark range
-    total_pixels = img.width * img.height
+    dark_pixels = luma_histogram[0:85].sum()  # Very dark range
     dark_ratio = dark_pixels / total_pixels
 
     # Check for overexposure (too many bright pixels)
-    bright_pixels = sum(histogram[170:256])  # Very bright range
+    bright_pixels = luma_histogram[170:256].sum()  # Very bright range
     bright_ratio = bright_pixels / total_pixels
 
     # Determine adjustments based on analysis
@@ -215,24 +276,28 @@ def analyze_and_adjust_lighting(img: Image.Image) -> Image.Image:
     elif bright_ratio > 0.2:  # Too many bright pixels
         gamma_factor = 1.2  # Darken mid-tones
 
-    # Apply enhancements
-    enhanced_img = img
-
-    # Brightness adjustment
+    # Brightness, contrast and gamma each map every level to a new level, so
+    # they are composed into one lookup table and applied in a single pass.
+    # Levels are truncated after each step, as the separate passes did.
+    lut = levels
     if brightness_factor != 1.0:
-        brightness_enhancer = ImageEnhance.Brightness(enhanced_img)
-        enhanced_img = brightness_enhancer.enhance(brightness_factor)
-
-    # Contrast adjustment
+        lut = _blend_levels(0.0, lut, brightness_factor)
     if contrast_factor != 1.0:
-        contrast_enhancer = ImageEnhance.Contrast(enhanced_img)
-        enhanced_img = contrast_enhancer.enhance(contrast_factor)
-
-    # Gamma correction (simulate with curve adjustment)
+        # Contrast pivots on the mean luminance of the brightened image, which
+        # follows from the histogram without another pass over the pixels
+        adjusted_means = histogram @ lut / counts
+        if len(adjusted_means) >= 3:
+            luminance = float(adjusted_means[:3] @ LUMA_WEIGHTS)
+        else:
+            luminance = float(adjusted_means[0])
+        lut = _blend_levels(float(int(luminance + 0.5)), lut, contrast_factor)
     if gamma_factor != 1.0:
-        # Create gamma lookup table
-        gamma_table = [int(((i / 255.0) ** gamma_factor) * 255) for i in range(256)]
-        enhanced_img = enhanced_img.point(gamma_table * 3)  # Apply to R, G, B
+        lut = _gamma_lut(gamma_factor)[lut.astype(np.intp)]
+
+    enhanced_img = img
+    if lut is not levels:
+        # The table goes to PIL as bytes, one 256-entry copy per band
+        enhanced_img = img.point(lut.astype(np.uint8).tobytes() * len(histogram))
 
     # Final subtle color enhancement
     color_enhancer = ImageEnhance.Color(enhanced_img)
@@ -241,8 +306,12 @@ def analyze_and_adjust_lighting(img: Image.Image) -> Image.Image:
     return enhanced_img
 
 
+@lru_cache(maxsize=256)
 def calculate_target_size(total_pixels: int, original_ratio: float) -> Tuple[int, int]:
-    """Calculate target dimensions based on total pixels and aspect ratio"""
+    """Calculate target dimensions based on total pixels and aspect ratio
+
+    Cached: a batch usually repeats a handful of (resolution, aspect ratio) pairs.
+    """
     target_width = int((total_pixels * original_ratio) ** 0.5)
     target_height = int(total_pixels / target_width)
 
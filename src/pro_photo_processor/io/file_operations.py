@@ -6,13 +6,94 @@ Handles ZIP extraction, directory operations, and file management.
 import datetime
 import os
 import shutil
-import subprocess
 import sys
-import tempfile
 import zipfile
-from typing import List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
 
-from pro_photo_processor.config.config import IMAGE_EXTENSIONS_CASE
+import numpy as np
+from PIL import Image
+
+from pro_photo_processor.config.config import IMAGE_EXTENSIONS
+
+JPEG_EXTENSIONS = (".jpg", ".jpeg")
+
+# Threads used to decompress ZIP members in parallel
+ZIP_EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
+ZIP_COPY_BUFFER = 1 << 20
+
+# Local file header, empty archive and spanned archive markers
+ZIP_SIGNATURES = (b"PK\x03\x04", b"PK\x05\x06", b"PK\x07\x08")
+
+# Threads reading output files for an archive, and files read ahead at once
+ZIP_READ_WORKERS = 4
+ZIP_READ_WINDOW = 16
+
+# Output formats stored as-is in archives instead of being deflated
+COMPRESSED_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".webp", ".heic"})
+
+
+@lru_cache(maxsize=None)
+def _load_turbo_jpeg() -> Any:
+    """
+    Create the optional libjpeg-turbo decoder once, on first use.
+    Not done at import time, so a missing or broken native library only
+    costs the fallback when a JPEG is actually decoded.
+    Returns None unless both PyTurboJPEG and the native library load.
+    """
+    try:
+        from turbojpeg import TurboJPEG
+
+        return TurboJPEG()
+    except (ImportError, OSError, RuntimeError):
+        return None
+
+
+def decode_jpeg(file_path: str) -> np.ndarray:
+    """Decode a JPEG file to an RGB array, using libjpeg-turbo when available"""
+    turbo_jpeg = _load_turbo_jpeg()
+    if turbo_jpeg is not None:
+        from turbojpeg import TJPF_RGB
+
+        with open(file_path, "rb") as f:
+            rgb_array: np.ndarray = turbo_jpeg.decode(f.read(), pixel_format=TJPF_RGB)
+        return rgb_array
+    with Image.open(file_path) as img:
+        return np.asarray(img.convert("RGB"))
+
+
+def load_image_rgb(file_path: str, target_pixels: Optional[int] = None) -> Image.Image:
+    """
+    Load a standard (non-RAW) image in RGB format.
+    JPEGs are decoded with libjpeg-turbo when available, keeping the EXIF
+    block so orientation correction still works.
+
+    When target_pixels is given, JPEGs far larger than the target are decoded
+    with libjpeg's scaled IDCT (1/2, 1/4 or 1/8), keeping at least twice the
+    target size on each side for the final Lanczos resize.
+    """
+    if target_pixels and file_path.lower().endswith(JPEG_EXTENSIONS):
+        jpeg = Image.open(file_path)
+        scale = (target_pixels / (jpeg.width * jpeg.height)) ** 0.5
+        if scale < 0.5:
+            jpeg.draft(
+                "RGB", (int(jpeg.width * scale * 2), int(jpeg.height * scale * 2))
+            )
+            return jpeg.convert("RGB")
+        jpeg.close()
+    if file_path.lower().endswith(JPEG_EXTENSIONS) and _load_turbo_jpeg() is not None:
+        try:
+            img = Image.fromarray(decode_jpeg(file_path))
+        except OSError:
+            pass  # e.g. CMYK JPEGs, which PIL handles below
+        else:
+            with Image.open(file_path) as src:
+                exif = src.info.get("exif")
+            if exif:
+                img.info["exif"] = exif
+            return img
+    return Image.open(file_path).convert("RGB")
 
 
 def prompt_to_open_folder(folder_path: str) -> None:
@@ -33,8 +114,12 @@ def prompt_to_open_folder(folder_path: str) -> None:
             if sys.platform == "win32":
                 os.startfile(folder_path)
             elif sys.platform == "darwin":  # macOS
+                import subprocess
+
                 subprocess.run(["open", folder_path])
             else:  # Linux and other Unix-like systems
+                import subprocess
+
                 subprocess.run(["xdg-open", folder_path])
 
             print("✅ Folder opened successfully!")
@@ -46,27 +131,89 @@ def prompt_to_open_folder(folder_path: str) -> None:
         print(f"📁 You can manually open: {folder_path}")
 
 
+def _member_path(dest_dir: str, filename: str) -> str:
+    """Destination path for a ZIP member, sanitized the way ZipFile.extract does"""
+    parts = filename.replace("\\", "/").split("/")
+    parts = [part for part in parts if part not in ("", os.curdir, os.pardir)]
+    return os.path.join(dest_dir, os.path.splitdrive(os.path.join(*parts))[1])
+
+
+def _extract_zip_members(
+    input_path: str, members: List[zipfile.ZipInfo], dest_dir: str
+) -> int:
+    """
+    Extract members through a private ZipFile handle (handles are not thread-safe).
+    Streams each member straight to disk in 1 MiB chunks instead of going
+    through ZipFile.extract; empty members are skipped.
+    """
+    extracted = 0
+    with zipfile.ZipFile(input_path, "r") as zip_ref:
+        for member in members:
+            if member.file_size == 0:
+                continue
+            dest_path = _member_path(dest_dir, member.filename)
+            with zip_ref.open(member) as src, open(dest_path, "wb", buffering=0) as dst:
+                shutil.copyfileobj(src, dst, min(member.file_size, ZIP_COPY_BUFFER))
+            extracted += 1
+    return extracted
+
+
+def _is_zip_file(path: str) -> bool:
+    """
+    Check the leading ZIP signature instead of seeking to the end-of-archive
+    record; anything else (e.g. an archive with a prepended stub) falls back
+    to zipfile.is_zipfile.
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(4)
+    except OSError:
+        return False
+    return head in ZIP_SIGNATURES or zipfile.is_zipfile(path)
+
+
 def extract_zip_if_needed(input_path: str) -> Tuple[Optional[str], bool]:
     """Extract ZIP file to temporary directory if input is a ZIP file"""
-    if input_path.lower().endswith(".zip") and zipfile.is_zipfile(input_path):
+    if input_path.lower().endswith(".zip") and _is_zip_file(input_path):
         print(f"📦 Detected ZIP file: {os.path.basename(input_path)}")
         print("🔧 Extracting images to temporary directory...")
 
+        # Only ZIP inputs need a temp dir, so tempfile is imported here
+        import tempfile
+
         # Create temporary directory
         temp_dir = tempfile.mkdtemp(prefix="photo_processing_")
 
         try:
             with zipfile.ZipFile(input_path, "r") as zip_ref:
                 # Extract image files including NEF
-                extracted_count = 0
+                members = [
+                    file_info
+                    for file_info in zip_ref.infolist()
+                    if os.path.splitext(file_info.filename)[1].lower()
+                    in IMAGE_EXTENSIONS
+                ]
 
-                for file_info in zip_ref.filelist:
-                    if file_info.filename.endswith(IMAGE_EXTENSIONS_CASE):
-                        zip_ref.extract(file_info, temp_dir)
-                        extracted_count += 1
+            # Create folders up front; extracting threads only write files
+            for file_info in members:
+                os.makedirs(
+                    os.path.dirname(_member_path(temp_dir, file_info.filename)),
+                    exist_ok=True,
+                )
 
-                print(f"✅ Extracted {extracted_count} image files")
-                return temp_dir, True  # Return temp_dir and is_temp flag
+            # Decompress and write members concurrently, one handle per thread
+            workers = max(1, min(ZIP_EXTRACT_WORKERS, len(members)))
+            chunks = [members[i::workers] for i in range(workers)]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                extracted_count = sum(
+                    executor.map(
+                        lambda chunk: _extract_zip_members(input_path, chunk, temp_dir),
+                        chunks,
+                    )
+                )
+
+            print(f"✅ Extracted {extracted_count} image files")
+            return temp_dir, True  # Return temp_dir and is_temp flag
 
         except Exception as e:
             print(f"❌ Failed to extract ZIP file: {e}")
@@ -89,14 +236,32 @@ def cleanup_temp_directory(temp_dir: str) -> None:
 def get_image_files_from_directory(directory: str) -> List[Tuple[str, str]]:
     """Get all image files from a directory, including subdirectories"""
     image_files = []
+    # Relative paths are sliced off this prefix instead of calling os.path.relpath
+    prefix_len = len(os.path.join(directory, ""))
 
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.endswith(IMAGE_EXTENSIONS_CASE):
-                full_path = os.path.join(root, file)
-                # Get relative path for better organization
-                rel_path = os.path.relpath(full_path, directory)
-                image_files.append((full_path, rel_path))
+    # Depth-first scandir walk; DirEntry type checks reuse the cached d_type.
+    # Like os.walk, unreadable or missing directories are skipped, not raised
+    pending = [directory]
+    while pending:
+        subdirs = []
+        current = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        continue
+                    if is_dir:
+                        # Like os.walk, symlinked directories are not descended into
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                        image_files.append((entry.path, entry.path[prefix_len:]))
+        except OSError:
+            continue
+        # Reversed so directories are visited in listing order, as with os.walk
+        pending.extend(reversed(subdirs))
 
     return image_files
 
@@ -117,16 +282,41 @@ def create_output_structure(
     return project_folder
 
 
+def _read_file(path: str) -> bytes:
+    """Read a whole file (runs on the archive reader threads)"""
+    with open(path, "rb") as f:
+        return f.read()
+
+
 def create_zip_archive(output_folder: str, project_folder: str, label: str) -> str:
     """Create ZIP archive of processed images"""
     zip_name = f"processed_photos_{label}.zip"
     zip_path = os.path.join(project_folder, zip_name)
 
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-        for file in os.listdir(output_folder):
-            full_path = os.path.join(output_folder, file)
-            zipf.write(
-                full_path, arcname=os.path.join(f"processed_photos_{label}", file)
-            )
+    arc_folder = f"processed_photos_{label}"
+    with os.scandir(output_folder) as entries:
+        files = [
+            (entry.path, os.path.join(arc_folder, entry.name))
+            for entry in entries
+            if entry.is_file()
+        ]
+
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED, allowZip64=True) as zipf:
+        # Threads read the files; this thread owns the (non thread-safe) writer.
+        # Reads are submitted a window at a time to bound memory.
+        with ThreadPoolExecutor(max_workers=ZIP_READ_WORKERS) as executor:
+            for start in range(0, len(files), ZIP_READ_WINDOW):
+                window = files[start : start + ZIP_READ_WINDOW]
+                contents = executor.map(_read_file, [path for path, _ in window])
+                for (full_path, arcname), data in zip(window, contents):
+                    zinfo = zipfile.ZipInfo.from_file(full_path, arcname)
+                    # Already entropy-coded formats gain nothing from DEFLATE
+                    if os.path.splitext(full_path)[1].lower() in COMPRESSED_EXTENSIONS:
+                        compress_type = zipfile.ZIP_STORED
+                    else:
+                        compress_type = zipfile.ZIP_DEFLATED
+                    zipf.writestr(
+                        zinfo, data, compress_type=compress_type, compresslevel=1
+                    )
 
     return zip_path
@@ -1,7 +1,415 @@
+import importlib
 import os
-from typing import Any, Dict, Optional
+import types
+from contextlib import contextmanager
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import psutil
 from PIL import Image
 
+from pro_photo_processor.utils import get_mode_prefix
+
+try:
+    import pyvips
+except (ImportError, OSError):  # OSError: binding present but libvips missing
+    pyvips = None
+
+# Image.reduce() pre-pass for big downscales: box-reduce while the remaining
+# Lanczos step still shrinks by at least this factor (quality stays the same)
+RESIZE_REDUCING_GAP = 3.0
+
+# Files read ahead of the one being processed in single-process runs
+PREFETCH_DEPTH = 2
+READ_AHEAD_CHUNK = 1 << 20
+# Output file buffer: Pillow's JPEG encoder writes 64 KB blocks, so a 1 MB
+# buffer turns a typical output into a few large writes (network drives)
+SAVE_BUFFER_SIZE = 1 << 20
+
+# Formats libvips decodes natively; RAW files keep going through rawpy
+VIPS_EXTENSIONS = (".jpg", ".jpeg", ".png", ".tif", ".tiff")
+# libvips kernels matching RESAMPLING_FILTER; other filters use the PIL path
+VIPS_KERNELS = {
+    Image.Resampling.NEAREST: "nearest",
+    Image.Resampling.BILINEAR: "linear",
+    Image.Resampling.BICUBIC: "cubic",
+    Image.Resampling.LANCZOS: "lanczos3",
+}
+
+
+def _read_ahead(full_path: str) -> None:
+    """Pull a source file into the OS page cache so its decode does not wait on disk"""
+    try:
+        with open(full_path, "rb", buffering=0) as f:
+            while f.read(READ_AHEAD_CHUNK):
+                pass
+    except OSError:
+        pass  # The worker reports unreadable files
+
+
+def _task_error(future: Future) -> Optional[Exception]:
+    """Return the exception raised by a finished worker task, if any"""
+    error = future.exception()
+    return error if isinstance(error, Exception) else None
+
+
+@contextmanager
+def _temporary_output(output_path: str) -> Iterator[str]:
+    """
+    Yield a temporary path next to output_path and move it into place on success.
+
+    On any failure the temporary file is removed and the error re-raised, so a
+    failed encode never leaves a truncated JPEG for the ZIP step to pick up.
+    """
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        yield temp_path
+        os.replace(temp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _resize_only_vips(
+    image_processor: Any,
+    full_path: str,
+    total_pixels: int,
+    output_path: str,
+    options: Dict[str, Any],
+) -> None:
+    """
+    Resize a single image with libvips for resize_only mode.
+
+    libvips streams the image, so memory stays flat no matter how large the
+    source is. Output matches the PIL path: EXIF orientation applied, target
+    pixel count at the original aspect ratio, no upscaling, the configured
+    resampling filter and JPEG settings, and an atomic save.
+    """
+    if pyvips is None:
+        raise ImportError("_resize_only_vips requires pyvips")
+    image = pyvips.Image.new_from_file(full_path, access="sequential").autorot()
+    target_width, target_height = image_processor.calculate_target_size(
+        total_pixels, image.width / image.height
+    )
+    # Source is already at or below the target; save it as-is instead of upscaling
+    if total_pixels < image.width * image.height and (
+        (target_width, target_height) != (image.width, image.height)
+    ):
+        image = image.resize(
+            target_width / image.width,
+            vscale=target_height / image.height,
+            kernel=VIPS_KERNELS[options["resample"]],
+        )
+    image = image.colourspace("srgb")
+    if image.bands > 3:
+        image = image.extract_band(0, n=3)
+    with _temporary_output(output_path) as temp_path:
+        # Same settings as _save_jpeg: quality 90 with 4:2:0 chroma subsampling
+        image.jpegsave(
+            temp_path,
+            Q=90,
+            optimize_coding=options["high_compression"],
+            subsample_mode="on",
+            strip=True,
+        )
+
+
+def _save_jpeg(img: Image.Image, output_path: str, optimize: bool) -> None:
+    """Encode img as a JPEG through a large write buffer, atomically"""
+    with _temporary_output(output_path) as temp_path:
+        with open(temp_path, "wb", buffering=SAVE_BUFFER_SIZE) as f:
+            img.save(f, "JPEG", quality=90, optimize=optimize, subsampling=2)
+
+
+def _save_for_targets(
+    image_processor: Any,
+    img: Image.Image,
+    name: str,
+    prefix: str,
+    targets: List[Tuple[int, str]],
+    options: Dict[str, Any],
+    resize: bool = True,
+) -> None:
+    """
+    Resize, watermark and save one decoded image once per output resolution.
+
+    Args:
+        image_processor: Image processing module.
+        img: Decoded, oriented and enhanced source image.
+        name: Base name of the source file.
+        prefix: Mode/preset prefix appended to the output file name.
+        targets: (total_pixels, output_folder) pairs, one per resolution,
+            ordered largest first.
+        options: Plain config values (watermark, JPEG and resize settings)
+            for the worker.
+        resize: False to keep the original size (watermark-only mode).
+    Returns:
+        None
+    """
+    new_filename = f"{os.path.splitext(name)[0]}_{prefix}.jpg"
+    original_ratio = img.width / img.height
+    # Targets come largest first, so each smaller one resizes from the
+    # previous (already smaller) output instead of the full source
+    current = img
+    # JPEG encoding releases the GIL, so each save runs on a background thread
+    # while the next resolution is resized and watermarked
+    with ThreadPoolExecutor(max_workers=1) as saver:
+        saves: List[Future] = []
+        for total_pixels, output_folder in targets:
+            final_img = img
+            if resize and total_pixels >= current.width * current.height:
+                # Source is already at or below the target; save it as-is
+                # instead of upscaling
+                final_img = current
+            elif resize:
+                # Resize to the target pixel count, preserving the aspect ratio
+                target_size = image_processor.calculate_target_size(
+                    total_pixels, original_ratio
+                )
+                if target_size != current.size:
+                    # Large downscales box-reduce first, then finish with the
+                    # configured filter (Lanczos by default)
+                    current = current.resize(
+                        target_size,
+                        options["resample"],
+                        reducing_gap=RESIZE_REDUCING_GAP,
+                    )
+                final_img = current
+
+            if options["enable_watermark"]:
+                final_img = image_processor.add_watermark(
+                    final_img,
+                    watermark_opacity=options["watermark_opacity"],
+                    scale_factor=options["watermark_scale"],
+                )
+
+            output_path = os.path.join(output_folder, new_filename)
+            # The Huffman optimisation pass roughly doubles encode time for a
+            # ~2-3% smaller file, so it is only run when asked for
+            saves.append(
+                saver.submit(
+                    _save_jpeg, final_img, output_path, options["high_compression"]
+                )
+            )
+        for save in saves:
+            save.result()
+
+
+def _process_image_file(
+    image_processor: Any,
+    full_path: str,
+    mode: str,
+    mode_prefix: str,
+    targets: List[Tuple[int, str]],
+    options: Dict[str, Any],
+) -> None:
+    """
+    Load, adjust, resize, watermark and save a single image for process_images.
+
+    The image is decoded and adjusted once, then resized for every target.
+    Kept at module level so it can be pickled into worker processes.
+
+    Args:
+        image_processor: Image processing module, or its import name when the
+            call runs in a worker process.
+        full_path: Path to the source image.
+        mode: Processing mode (e.g. 'full', 'resize_only').
+        mode_prefix: Output file name prefix for the mode.
+        targets: (total_pixels, output_folder) pairs, one per resolution.
+        options: Plain config values (watermark, JPEG and resize settings)
+            for the worker.
+    Returns:
+        None
+    """
+    if isinstance(image_processor, str):
+        image_processor = importlib.import_module(image_processor)
+
+    name = os.path.basename(full_path)
+
+    if (
+        mode == "resize_only"
+        and pyvips is not None
+        and options["resample"] in VIPS_KERNELS
+        and full_path.lower().endswith(VIPS_EXTENSIONS)
+    ):
+        new_filename = f"{os.path.splitext(name)[0]}_{mode_prefix}.jpg"
+        for total_pixels, output_folder in targets:
+            output_path = os.path.join(output_folder, new_filename)
+            _resize_only_vips(
+                image_processor, full_path, total_pixels, output_path, options
+            )
+        print(f"   📐 Resize only (no watermark) for {name}")
+        return
+
+    # Only the resized pixels are kept (lighting is a global adjustment), so
+    # large JPEGs and RAWs can decode pre-shrunk; watermark mode keeps full size
+    largest = None
+    if mode != "watermark":
+        largest = max(total_pixels for total_pixels, _ in targets)
+
+    # Use basic loading for watermark modes, enhanced for full mode. Resized
+    # output hides the softer bilinear demosaic; full-size watermarks keep AHD
+    if mode in ("resize_only", "watermark", "resize_watermark"):
+        img = image_processor.load_image_basic(
+            full_path, target_pixels=largest, fast=largest is not None
+        )
+    else:
+        img = image_processor.load_image_smart_enhanced(
+            full_path, target_pixels=largest
+        )
+
+    # Apply EXIF rotation to get the visual orientation you see in file explorer
+    img = image_processor.fix_image_orientation(img)
+
+    if mode == "full":
+        # Intelligent lighting analysis and adjustment
+        img = image_processor.analyze_and_adjust_lighting(img)
+
+    # Add watermark to the processed image (skip for resize_only mode)
+    if mode == "resize_only":
+        options = {**options, "enable_watermark": False}
+        print(f"   📐 Resize only (no watermark) for {name}")
+    elif options["enable_watermark"]:
+        print(f"   💧 Added watermark to {name}")
+    else:
+        print(f"   ⚠️ Watermark disabled in config for {name}")
+
+    # Watermark-only mode keeps the original size
+    _save_for_targets(
+        image_processor,
+        img,
+        name,
+        mode_prefix,
+        targets,
+        options,
+        resize=mode in ("full", "resize_watermark", "resize_only"),
+    )
+
+
+def _process_preset_file(
+    image_processor: Any,
+    full_path: str,
+    optimal_preset: str,
+    prefix: str,
+    targets: List[Tuple[int, str]],
+    options: Dict[str, Any],
+) -> None:
+    """
+    Load, apply a Photoshop-style preset, resize, watermark and save a single
+    image for process_with_preset.
+
+    Args:
+        image_processor: Image processing module, or its import name when the
+            call runs in a worker process.
+        full_path: Path to the source image.
+        optimal_preset: Preset actually applied (format-optimized).
+        prefix: Output file name prefix for the requested preset.
+        targets: (total_pixels, output_folder) pairs, one per resolution.
+        options: Plain config values (watermark, JPEG and resize settings)
+            for the worker.
+    Returns:
+        None
+    """
+    if isinstance(image_processor, str):
+        image_processor = importlib.import_module(image_processor)
+
+    img = image_processor.load_image_smart_enhanced(full_path)
+
+    # Apply EXIF rotation
+    img = image_processor.fix_image_orientation(img)
+
+    # Apply Photoshop-style preset
+    enhanced_img, history = image_processor.apply_photoshop_preset(img, optimal_preset)
+
+    # Show last 3 adjustments
+    name = os.path.basename(full_path)
+    print(f"   📝 {name}: {', '.join(history[-3:])}")
+
+    _save_for_targets(
+        image_processor,
+        enhanced_img,
+        name,
+        prefix,
+        targets,
+        options,
+    )
+
+
+def _process_custom_file(
+    image_processor: Any,
+    full_path: str,
+    custom_preset: Dict[str, float],
+    prefix: str,
+    targets: List[Tuple[int, str]],
+    options: Dict[str, Any],
+) -> None:
+    """
+    Load, apply custom adjustments, resize, watermark and save a single image
+    for process_with_custom_preset.
+
+    Args:
+        image_processor: Image processing module, or its import name when the
+            call runs in a worker process.
+        full_path: Path to the source image.
+        custom_preset: Dictionary of custom adjustment values.
+        prefix: Output file name prefix for custom processing.
+        targets: (total_pixels, output_folder) pairs, one per resolution.
+        options: Plain config values (watermark, JPEG and resize settings)
+            for the worker.
+    Returns:
+        None
+    """
+    if isinstance(image_processor, str):
+        image_processor = importlib.import_module(image_processor)
+
+    img = image_processor.load_image_smart_enhanced(full_path)
+    img = image_processor.fix_image_orientation(img)
+
+    # Apply custom adjustments using a PhotoshopStyleEnhancer-like interface
+    enhancer = image_processor.PhotoshopStyleEnhancer(img)
+
+    # Apply either exposure or brightness (exposure takes priority)
+    if custom_preset.get("exposure", 0) != 0:
+        enhancer.exposure_adjustment(custom_preset.get("exposure", 0))
+    elif custom_preset.get("brightness", 0) != 0:
+        enhancer.brightness_adjustment(custom_preset.get("brightness", 0))
+
+    enhancer.highlights_shadows(
+        highlights=custom_preset.get("highlights", 0),
+        shadows=custom_preset.get("shadows", 0),
+    )
+    enhancer.vibrance_saturation(
+        vibrance=custom_preset.get("vibrance", 0),
+        saturation=custom_preset.get("saturation", 0),
+    )
+    enhancer.clarity_structure(
+        clarity=custom_preset.get("clarity", 0),
+        structure=custom_preset.get("structure", 0),
+    )
+    enhancer.color_temperature(temperature=custom_preset.get("temperature", 0))
+    enhancer.portrait_enhancements(
+        skin_smoothing=custom_preset.get("skin_smoothing", 0)
+    )
+
+    _save_for_targets(
+        image_processor,
+        enhancer.get_result(),
+        os.path.basename(full_path),
+        prefix,
+        targets,
+        options,
+    )
+
 
 class ImageProcessingPipeline:
     def __init__(
@@ -10,6 +418,7 @@ class ImageProcessingPipeline:
         file_ops: Any,
         image_processor: Any,
         preset_manager: Optional[Any] = None,
+        workers: int = 1,
     ) -> None:
         """
         Initialize the image processing pipeline with required dependencies.
@@ -19,11 +428,122 @@ class ImageProcessingPipeline:
             file_ops: File operations module or class.
             image_processor: Image processing utilities module or class.
             preset_manager: Optional preset/format optimizer.
+            workers: Number of processes used per batch (1 = run in-process).
         """
         self.config = config
         self.file_ops = file_ops
         self.image_processor = image_processor
         self.preset_manager = preset_manager
+        self.workers = max(1, workers)
+
+    def _worker_options(self) -> Dict[str, Any]:
+        """Plain config values for per-file workers, safe to send to other processes"""
+        return {
+            "enable_watermark": self.config.ENABLE_WATERMARK,
+            "watermark_opacity": self.config.WATERMARK_OPACITY,
+            "watermark_scale": self.config.WATERMARK_SCALE,
+            "high_compression": getattr(self.config, "HIGH_COMPRESSION", False),
+            "resample": Image.Resampling[
+                getattr(self.config, "RESAMPLING_FILTER", "LANCZOS")
+            ],
+        }
+
+    def _create_output_folders(
+        self, project_output_dir: str, suffix: str
+    ) -> List[Tuple[str, int, str]]:
+        """
+        Create one output folder per configured resolution up front.
+
+        Args:
+            project_output_dir: Project output directory.
+            suffix: Mode or preset suffix for the folder names.
+        Returns:
+            List of (label, total_pixels, output_folder) tuples.
+        """
+        outputs = []
+        for label, total_pixels in self.config.RESOLUTIONS.items():
+            output_folder = os.path.join(
+                project_output_dir, f"processed_photos_{label}_{suffix}"
+            )
+            os.makedirs(output_folder, exist_ok=True)
+            outputs.append((label, total_pixels, output_folder))
+        return outputs
+
+    @staticmethod
+    def _save_targets(outputs: List[Tuple[str, int, str]]) -> List[Tuple[int, str]]:
+        """
+        Per-file (total_pixels, output_folder) targets, largest first.
+
+        Built once per batch so workers neither sort nor rebuild them per image.
+        """
+        return sorted(
+            ((total_pixels, folder) for _, total_pixels, folder in outputs),
+            reverse=True,
+        )
+
+    def _zip_output_folders(
+        self, project_output_dir: str, outputs: List[Tuple[str, int, str]], suffix: str
+    ) -> None:
+        """Create one ZIP archive per resolution folder"""
+        for label, _, output_folder in outputs:
+            zip_path = self.file_ops.create_zip_archive(
+                output_folder, project_output_dir, f"{label}_{suffix}"
+            )
+            print(f"✅ Finished {label.upper()} folder zipped at:\n{zip_path}")
+
+    def _run_file_tasks(
+        self, worker: Callable[..., None], tasks: List[Tuple[Any, ...]]
+    ) -> Iterator[Tuple[str, Optional[Exception]]]:
+        """
+        Run a per-file worker over tasks, in-process or across a process pool.
+
+        Each task is the worker's argument tuple without the leading
+        image_processor, and starts with the source file path.
+
+        Args:
+            worker: Module-level function called as worker(image_processor, *task).
+            tasks: Argument tuples, one per file.
+        Returns:
+            Iterator of (full_path, error) pairs; error is None on success.
+        """
+        if self.workers == 1 or len(tasks) <= 1:
+            # Read the next files into the page cache while this one is processed
+            with ThreadPoolExecutor(max_workers=PREFETCH_DEPTH) as prefetcher:
+                for task in tasks[:PREFETCH_DEPTH]:
+                    prefetcher.submit(_read_ahead, task[0])
+                for index, task in enumerate(tasks):
+                    if index + PREFETCH_DEPTH < len(tasks):
+                        prefetcher.submit(_read_ahead, tasks[index + PREFETCH_DEPTH][0])
+                    try:
+                        worker(self.image_processor, *task)
+                        yield task[0], None
+                    except Exception as e:
+                        yield task[0], e
+            return
+
+        # Modules cannot be pickled; workers re-import them by name
+        image_processor = (
+            self.image_processor.__name__
+            if isinstance(self.image_processor, types.ModuleType)
+            else self.image_processor
+        )
+        # Never decode more images at once than available memory can hold
+        memory_per_image = getattr(self.config, "WORKER_MEMORY_MB", 800) * 1024**2
+        workers = min(
+            self.workers,
+            max(1, psutil.virtual_memory().available // memory_per_image),
+        )
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Bounded submission: at most two queued tasks per worker
+            pending: Dict[Future, str] = {}
+            for task in tasks:
+                if len(pending) >= 2 * workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield pending.pop(future), _task_error(future)
+                pending[executor.submit(worker, image_processor, *task)] = task[0]
+            for future in as_completed(pending):
+                yield pending[future], _task_error(future)
 
     def process_images(self, input_path: str, mode: str = "full") -> None:
         """
@@ -58,119 +578,29 @@ class ImageProcessingPipeline:
 
             print(f"📁 Found {len(image_files)} image files to process")
 
-            from pro_photo_processor.utils import get_mode_prefix
+            options = self._worker_options()
 
-            for label, total_pixels in self.config.RESOLUTIONS.items():
-                # Add mode suffix to directory name for proper separation
-                mode_suffix = get_mode_prefix(mode)
-                output_folder = os.path.join(
-                    project_output_dir, f"processed_photos_{label}_{mode_suffix}"
-                )
-                os.makedirs(output_folder, exist_ok=True)
+            # Add mode suffix to directory name for proper separation
+            mode_suffix = get_mode_prefix(mode)
+            outputs = self._create_output_folders(project_output_dir, mode_suffix)
+            targets = self._save_targets(outputs)
 
-                print(f"\nProcessing {label.upper()} images...")
+            labels = ", ".join(label.upper() for label, _, _ in outputs)
+            print(f"\nProcessing {labels} images...")
 
-                for idx, (full_path, rel_path) in enumerate(image_files, 1):
-                    try:
-                        # Use basic loading for watermark modes, enhanced for full mode
-                        if (
-                            mode == "watermark"
-                            or mode == "resize_watermark"
-                            or mode == "resize_only"
-                        ):
-                            img = self.image_processor.load_image_basic(full_path)
-                        else:
-                            img = self.image_processor.load_image_smart_enhanced(
-                                full_path
-                            )
-
-                        # Apply EXIF rotation to get the visual orientation you see in file explorer
-                        img = self.image_processor.fix_image_orientation(img)
-
-                        if mode == "full":
-                            # Intelligent lighting analysis and adjustment
-                            img = self.image_processor.analyze_and_adjust_lighting(img)
-
-                            # Calculate target size maintaining original aspect ratio
-                            original_ratio = img.width / img.height
-
-                            # Calculate dimensions to match target pixel count while preserving ratio
-                            target_width = int((total_pixels * original_ratio) ** 0.5)
-                            target_height = int(total_pixels / target_width)
-
-                            target_size = (target_width, target_height)
-
-                            # Resize to exact target size
-                            final_img = img.resize(
-                                target_size, Image.Resampling.LANCZOS
-                            )
-                        elif mode == "resize_watermark":
-                            # Resize without any enhancements
-                            original_ratio = img.width / img.height
-
-                            # Calculate dimensions to match target pixel count while preserving ratio
-                            target_width = int((total_pixels * original_ratio) ** 0.5)
-                            target_height = int(total_pixels / target_width)
-
-                            target_size = (target_width, target_height)
-
-                            # Resize to exact target size
-                            final_img = img.resize(
-                                target_size, Image.Resampling.LANCZOS
-                            )
-                        elif mode == "resize_only":
-                            # Resize only without any enhancements or watermark
-                            original_ratio = img.width / img.height
-
-                            # Calculate dimensions to match target pixel count while preserving ratio
-                            target_width = int((total_pixels * original_ratio) ** 0.5)
-                            target_height = int(total_pixels / target_width)
-
-                            target_size = (target_width, target_height)
-
-                            # Resize to exact target size
-                            final_img = img.resize(
-                                target_size, Image.Resampling.LANCZOS
-                            )
-                        else:
-                            # Watermark-only mode: keep original size
-                            final_img = img
-
-                        # Add watermark to the processed image (skip for resize_only mode)
-                        if self.config.ENABLE_WATERMARK and mode != "resize_only":
-                            final_img = self.image_processor.add_watermark(
-                                final_img,
-                                watermark_opacity=self.config.WATERMARK_OPACITY,
-                                scale_factor=self.config.WATERMARK_SCALE,
-                            )
-                            print(
-                                f"   💧 Added watermark to {os.path.basename(full_path)}"
-                            )
-                        elif mode == "resize_only":
-                            print(
-                                f"   📐 Resize only (no watermark) for {os.path.basename(full_path)}"
-                            )
-                        else:
-                            print(
-                                f"   ⚠️ Watermark disabled in config for {os.path.basename(full_path)}"
-                            )
-
-                        # Save with original filename prefix + mode prefix
-                        original_name = os.path.splitext(os.path.basename(full_path))[0]
-                        mode_prefix = self.image_processor.get_mode_prefix(mode)
-                        new_filename = f"{original_name}_{mode_prefix}.jpg"
-                        output_path = os.path.join(output_folder, new_filename)
-                        final_img.save(output_path, "JPEG", quality=90, optimize=True)
-                    except Exception as e:
-                        print(
-                            f"❌ Failed to process {os.path.basename(full_path)}: {e}"
-                        )
+            # One task per image: decode once, save every resolution
+            tasks = [
+                (full_path, mode, mode_suffix, targets, options)
+                for full_path, _ in image_files
+            ]
+            for full_path, error in self._run_file_tasks(_process_image_file, tasks):
+                if error is not None:
+                    print(
+                        f"❌ Failed to process {os.path.basename(full_path)}: {error}"
+                    )
 
-                # Create ZIP archive with mode suffix
-                zip_path = self.file_ops.create_zip_archive(
-                    output_folder, project_output_dir, f"{label}_{mode_suffix}"
-                )
-                print(f"✅ Finished {label.upper()} folder zipped at:\n{zip_path}")
+            # Create ZIP archives with mode suffix
+            self._zip_output_folders(project_output_dir, outputs, mode_suffix)
 
         finally:
             # Clean up temporary directory if needed
@@ -219,11 +649,15 @@ class ImageProcessingPipeline:
             print(f"📁 Found {len(image_files)} image files to process")
 
             # Analyze formats in the batch if optimizer is available
+            # Each file's format is detected once and reused for preset selection
+            file_formats = ["unknown"] * len(image_files)
             if optimizer is not None:
-                file_paths = [full_path for full_path, _ in image_files]
+                file_formats = [
+                    optimizer.detect_file_format(full_path)
+                    for full_path, _ in image_files
+                ]
                 format_counts = {"raw": 0, "jpeg": 0, "unknown": 0}
-                for file_path in file_paths:
-                    format_type = optimizer.detect_file_format(file_path)
+                for format_type in file_formats:
                     format_counts[format_type] += 1
 
                 if format_counts["raw"] > 0 or format_counts["jpeg"] > 0:
@@ -235,98 +669,45 @@ class ImageProcessingPipeline:
                             "🔄 Mixed formats detected - automatic optimization will choose:"
                         )
                         print(
-                            f"   📷 RAW files -> {optimizer.get_optimal_preset('dummy.nef', preset_name)}"
+                            f"   📷 RAW files -> {optimizer.preset_for_format('raw', preset_name)}"
                         )
                         print(
-                            f"   🖼️  JPEG files -> {optimizer.get_optimal_preset('dummy.jpg', preset_name)}"
+                            f"   🖼️  JPEG files -> {optimizer.preset_for_format('jpeg', preset_name)}"
                         )
 
-            for label, total_pixels in self.config.RESOLUTIONS.items():
-                output_folder = os.path.join(
-                    project_output_dir, f"processed_photos_{label}_{preset_name}"
-                )
-                os.makedirs(output_folder, exist_ok=True)
-
-                print(
-                    f"\nProcessing {label.upper()} images with {preset_name} preset..."
-                )
-
-                for idx, (full_path, rel_path) in enumerate(image_files, 1):
-                    try:
-                        img = self.image_processor.load_image_smart_enhanced(full_path)
-
-                        # Apply EXIF rotation
-                        img = self.image_processor.fix_image_orientation(img)
+            options = self._worker_options()
 
-                        # Get format-optimized preset if optimizer is available
-                        optimal_preset = (
-                            optimizer.get_optimal_preset(full_path, preset_name)
-                            if optimizer is not None
-                            else preset_name
-                        )
-                        format_info = (
-                            optimizer.get_format_info(full_path)
-                            if optimizer is not None
-                            else {
-                                "filename": os.path.basename(full_path),
-                                "format": "unknown",
-                            }
-                        )
+            outputs = self._create_output_folders(project_output_dir, preset_name)
+            prefix = self.image_processor.get_mode_prefix(preset_name)
+            targets = self._save_targets(outputs)
 
-                        # Show format optimization info if different preset was chosen
-                        if optimal_preset != preset_name:
-                            print(
-                                f"   🔄 {format_info['filename']} ({format_info['format'].upper()}) -> using {optimal_preset}"
-                            )
-
-                        # Apply Photoshop-style preset
-                        enhanced_img, history = (
-                            self.image_processor.apply_photoshop_preset(
-                                img, optimal_preset
-                            )
-                        )
+            labels = ", ".join(label.upper() for label, _, _ in outputs)
+            print(f"\nProcessing {labels} images with {preset_name} preset...")
 
-                        # Show last 3 adjustments
+            tasks = []
+            for (full_path, _), file_format in zip(image_files, file_formats):
+                # Get format-optimized preset if optimizer is available
+                optimal_preset = preset_name
+                if optimizer is not None:
+                    optimal_preset = optimizer.preset_for_format(
+                        file_format, preset_name
+                    )
+                    # Show format optimization info if different preset was chosen
+                    if optimal_preset != preset_name:
                         print(
-                            f"   📝 {os.path.basename(full_path)}: {', '.join(history[-3:])}"
+                            f"   🔄 {os.path.basename(full_path)} ({file_format.upper()}) -> using {optimal_preset}"
                         )
 
-                        # Calculate target size maintaining original aspect ratio
-                        original_ratio = enhanced_img.width / enhanced_img.height
-                        target_width = int((total_pixels * original_ratio) ** 0.5)
-                        target_height = int(total_pixels / target_width)
-                        target_size = (target_width, target_height)
+                tasks.append((full_path, optimal_preset, prefix, targets, options))
 
-                        # Resize to exact target size
-                        final_img = enhanced_img.resize(
-                            target_size, Image.Resampling.LANCZOS
-                        )
-
-                        # Add watermark
-                        if self.config.ENABLE_WATERMARK:
-                            final_img = self.image_processor.add_watermark(
-                                final_img,
-                                watermark_opacity=self.config.WATERMARK_OPACITY,
-                                scale_factor=self.config.WATERMARK_SCALE,
-                            )
-
-                        # Save with original filename prefix + mode prefix
-                        original_name = os.path.splitext(os.path.basename(full_path))[0]
-                        mode_prefix = self.image_processor.get_mode_prefix(preset_name)
-                        new_filename = f"{original_name}_{mode_prefix}.jpg"
-                        output_path = os.path.join(output_folder, new_filename)
-                        final_img.save(output_path, "JPEG", quality=90, optimize=True)
+            for full_path, error in self._run_file_tasks(_process_preset_file, tasks):
+                if error is not None:
+                    print(
+                        f"❌ Failed to process {os.path.basename(full_path)}: {error}"
+                    )
 
-                    except Exception as e:
-                        print(
-                            f"❌ Failed to process {os.path.basename(full_path)}: {e}"
-                        )
-
-                # Create ZIP archive
-                zip_path = self.file_ops.create_zip_archive(
-                    output_folder, project_output_dir, f"{label}_{preset_name}"
-                )
-                print(f"✅ Finished {label.upper()} folder zipped at:\n{zip_path}")
+            # Create ZIP archives
+            self._zip_output_folders(project_output_dir, outputs, preset_name)
 
         finally:
             # Clean up temporary directory if needed
@@ -368,89 +749,27 @@ class ImageProcessingPipeline:
 
             print(f"📁 Found {len(image_files)} image files to process")
 
-            for label, total_pixels in self.config.RESOLUTIONS.items():
-                output_folder = os.path.join(
-                    project_output_dir, f"processed_photos_{label}_custom"
-                )
-                os.makedirs(output_folder, exist_ok=True)
-
-                print(f"\nProcessing {label.upper()} images with custom settings...")
+            options = self._worker_options()
 
-                for idx, (full_path, rel_path) in enumerate(image_files, 1):
-                    try:
-                        img = self.image_processor.load_image_smart_enhanced(full_path)
-                        img = self.image_processor.fix_image_orientation(img)
-
-                        # Apply custom adjustments using a PhotoshopStyleEnhancer-like interface
-                        enhancer = self.image_processor.PhotoshopStyleEnhancer(img)
-
-                        # Apply either exposure or brightness (exposure takes priority)
-                        if custom_preset.get("exposure", 0) != 0:
-                            enhancer.exposure_adjustment(
-                                custom_preset.get("exposure", 0)
-                            )
-                        elif custom_preset.get("brightness", 0) != 0:
-                            enhancer.brightness_adjustment(
-                                custom_preset.get("brightness", 0)
-                            )
-
-                        enhancer.highlights_shadows(
-                            highlights=custom_preset.get("highlights", 0),
-                            shadows=custom_preset.get("shadows", 0),
-                        )
-                        enhancer.vibrance_saturation(
-                            vibrance=custom_preset.get("vibrance", 0),
-                            saturation=custom_preset.get("saturation", 0),
-                        )
-                        enhancer.clarity_structure(
-                            clarity=custom_preset.get("clarity", 0),
-                            structure=custom_preset.get("structure", 0),
-                        )
-                        enhancer.color_temperature(
-                            temperature=custom_preset.get("temperature", 0)
-                        )
-                        enhancer.portrait_enhancements(
-                            skin_smoothing=custom_preset.get("skin_smoothing", 0)
-                        )
+            outputs = self._create_output_folders(project_output_dir, "custom")
+            prefix = self.image_processor.get_mode_prefix("custom")
+            targets = self._save_targets(outputs)
 
-                        enhanced_img = enhancer.get_result()
+            labels = ", ".join(label.upper() for label, _, _ in outputs)
+            print(f"\nProcessing {labels} images with custom settings...")
 
-                        # Resize
-                        original_ratio = enhanced_img.width / enhanced_img.height
-                        target_width = int((total_pixels * original_ratio) ** 0.5)
-                        target_height = int(total_pixels / target_width)
-                        target_size = (target_width, target_height)
-                        final_img = enhanced_img.resize(
-                            target_size, Image.Resampling.LANCZOS
-                        )
-
-                        # Add watermark
-                        if self.config.ENABLE_WATERMARK:
-                            final_img = self.image_processor.add_watermark(
-                                final_img,
-                                watermark_opacity=self.config.WATERMARK_OPACITY,
-                                scale_factor=self.config.WATERMARK_SCALE,
-                            )
-
-                        # Save with original filename prefix + mode prefix
-                        original_name = os.path.splitext(os.path.basename(full_path))[0]
-                        mode_prefix = self.image_processor.get_mode_prefix("custom")
-                        new_filename = f"{original_name}_{mode_prefix}.jpg"
-                        output_path = os.path.join(output_folder, new_filename)
-                        final_img.save(output_path, "JPEG", quality=90, optimize=True)
-
-                    except Exception as e:
-                        print(
-                            f"❌ Failed to process {os.path.basename(full_path)}: {e}"
-                        )
+            tasks = [
+                (full_path, custom_preset, prefix, targets, options)
+                for full_path, _ in image_files
+            ]
+            for full_path, error in self._run_file_tasks(_process_custom_file, tasks):
+                if error is not None:
+                    print(
+                        f"❌ Failed to process {os.path.basename(full_path)}: {error}"
+                    )
 
-                # Create ZIP archive
-                zip_path = self.file_ops.create_zip_archive(
-                    output_folder, project_output_dir, f"{label}_custom"
-                )
-                print(
-                    f"✅ Finished {label.upper()} custom folder zipped at:\n{zip_path}"
-                )
+            # Create ZIP archives
+            self._zip_output_folders(project_output_dir, outputs, "custom")
 
         finally:
             # Clean up temporary directory if needed
@@ -62,8 +62,12 @@ class FormatOptimizer:
         self, filepath: Union[str, Path], requested_preset: str
     ) -> str:
         """Get the optimal preset based on file format"""
-        file_format = self.detect_file_format(filepath)
+        return self.preset_for_format(
+            self.detect_file_format(filepath), requested_preset
+        )
 
+    def preset_for_format(self, file_format: str, requested_preset: str) -> str:
+        """Get the optimal preset for an already detected format ('raw', 'jpeg', 'unknown')"""
         if file_format == "unknown":
             return requested_preset
 
@@ -3,11 +3,43 @@ Professional Photo Enhancement Tools - Photoshop-style processing options
 This module provides advanced image enhancement capabilities similar to professional software
 """
 
+import types
 from typing import List, Tuple, Union
 
 import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter
 
+numba: types.ModuleType | None
+try:
+    import numba
+except ImportError:
+    numba = None
+
+_prange = numba.prange if numba is not None else range
+
+
+def _scale_midtones_loop(arr: np.ndarray, low: int, high: int, factor: float) -> None:
+    """Scale, in place, the RGB pixels whose channel maximum lies in (low, high)"""
+    height, width, channels = arr.shape
+    for y in _prange(height):
+        for x in range(width):
+            value = max(arr[y, x, 0], arr[y, x, 1], arr[y, x, 2])
+            if low < value < high:
+                for c in range(channels):
+                    arr[y, x, c] = np.uint8(arr[y, x, c] * factor)
+
+
+def _scale_midtones_numpy(arr: np.ndarray, low: int, high: int, factor: float) -> None:
+    """Vectorized fallback for _scale_midtones_loop when numba is unavailable"""
+    value = arr.max(axis=2)
+    mask = (value > low) & (value < high)
+    arr[mask] = (arr[mask] * factor).astype(np.uint8)
+
+
+_scale_midtones = _scale_midtones_numpy
+if numba is not None:
+    _scale_midtones = numba.njit(parallel=True, cache=True)(_scale_midtones_loop)
+
 
 class PhotoshopStyleEnhancer:
     """Professional photo enhancement tools similar to Photoshop/Lightroom"""
@@ -260,13 +292,10 @@ class PhotoshopStyleEnhancer:
         sand, ground, and other bright horizontal surfaces in sports photography.
         Only applies protection when bright midtones are detected.
         """
-        import numpy as np
-
-        # Convert to HSV for better luminance analysis
-        hsv_array = np.array(self.working.convert("HSV"))
+        rgb_array = np.array(self.working.convert("RGB"))
 
-        # Analyze the brightness distribution
-        brightness = hsv_array[:, :, 2]  # V channel (brightness)
+        # HSV value channel (brightness) is the per-pixel channel maximum
+        brightness = rgb_array.max(axis=2)
 
         # Detect potentially problematic bright midtones (sand/ground areas)
         # Focus on areas that are bright enough to be sand but not highlights
@@ -285,36 +314,12 @@ class PhotoshopStyleEnhancer:
         )
 
         if should_protect:
-            # Create a more targeted protection for very bright midtones
             # Focus on the brightest midtones (160-200 range) which are most likely sand
-            target_mask = (brightness > 160) & (brightness < 200)
-
-            if np.any(target_mask):
-                # Apply gentle darkening factor for sand protection
-                darkening_factor = 0.94  # Reduce brightness by 6%
-
-                # Apply the darkening only to the detected areas
-                protected_brightness: np.ndarray = brightness.copy().astype(np.float32)
-                protected_brightness[target_mask] *= darkening_factor
-
-                # Ensure values stay within valid range
-                protected_brightness = np.clip(protected_brightness, 0, 255).astype(
-                    np.uint8
-                )
-
-                # Apply the protected brightness back to the image
-                hsv_array[:, :, 2] = protected_brightness
-
-                # Convert back to RGB - use context manager to suppress deprecation warning
-                import warnings
-
-                with warnings.catch_warnings():
-                    warnings.filterwarnings("ignore", category=DeprecationWarning)
-                    hsv_img = Image.fromarray(hsv_array.astype(np.uint8), mode="HSV")
-                    protected_img = hsv_img.convert("RGB")
-
-                # Blend with original for natural transition
-                self.working = Image.blend(self.working, protected_img, 0.5)
+            if np.any((brightness > 160) & (brightness < 200)):
+                # Darken by 6% and blend 50/50 with the original, fused into a
+                # single 3% scale of the target pixels
+                _scale_midtones(rgb_array, 160, 200, 0.97)
+                self.working = Image.fromarray(rgb_array)
 
                 self.history.append(
                     f"Midtone Protection: Applied ({bright_midtone_percentage * 100:.1f}% bright areas)"
@@ -0,0 +1,116 @@
+"""
+Disk cache for decoded RAW images.
+
+A full LibRaw demosaic takes seconds per file, so re-running a batch with a
+different preset re-reads the decoded 8-bit RGB array from disk instead.
+Entries are keyed by the file's path, size and mtime plus the decode
+settings, so an edited or replaced RAW is decoded again.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from pro_photo_processor.config import config
+
+logger = logging.getLogger(__name__)
+
+CACHE_SUFFIX = ".npy"
+
+
+def cache_dir() -> str:
+    """Directory holding cached decodes (config.RAW_CACHE_DIR or the temp dir)"""
+    return config.RAW_CACHE_DIR or os.path.join(
+        tempfile.gettempdir(), "pro_photo_cache"
+    )
+
+
+def cache_key(file_path: str, variant: str) -> Optional[str]:
+    """
+    Build the cache key for a RAW file decoded with the given settings.
+
+    Args:
+        file_path (str): Path to the RAW image file
+        variant (str): Decode settings that change the output pixels
+
+    Returns:
+        str: Hex key, or None when caching is disabled or the file is missing
+    """
+    if not config.RAW_CACHE_ENABLED:
+        return None
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    ident = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}|{variant}"
+    return hashlib.blake2b(ident.encode(), digest_size=16).hexdigest()
+
+
+def load_cached(key: Optional[str]) -> Optional[Image.Image]:
+    """Return the cached decode for key, or None on a miss"""
+    if key is None:
+        return None
+    path = os.path.join(cache_dir(), key + CACHE_SUFFIX)
+    try:
+        rgb_array = np.load(path, mmap_mode="r")
+        img = Image.fromarray(np.asarray(rgb_array))
+        # Refresh the mtime so eviction drops the least recently used entries
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+    return img
+
+
+def store(key: Optional[str], rgb_array: np.ndarray) -> None:
+    """
+    Write decoded pixels to the cache and evict old entries over the limits.
+    Takes the array rather than the PIL image, so callers that still hold the
+    decode output do not pay for another full-size copy just to save it.
+    """
+    if key is None:
+        return
+    directory = cache_dir()
+    path = os.path.join(directory, key + CACHE_SUFFIX)
+    # Workers may decode the same file at once, so write aside and rename
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(temp_path, "wb") as f:
+            np.save(f, rgb_array)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning("⚠️ Could not cache decoded RAW: %s", e)
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return
+    evict(directory)
+
+
+def evict(directory: str) -> None:
+    """Remove least recently used entries beyond RAW_CACHE_MAX_FILES / _MAX_MB"""
+    entries = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.endswith(CACHE_SUFFIX):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    except OSError:
+        return
+    entries.sort(reverse=True)
+    max_bytes = config.RAW_CACHE_MAX_MB * 1024 * 1024
+    total = 0
+    for count, (_, size, path) in enumerate(entries, 1):
+        total += size
+        if count > config.RAW_CACHE_MAX_FILES or total > max_bytes:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
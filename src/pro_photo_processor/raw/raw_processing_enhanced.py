@@ -3,31 +3,32 @@ Enhanced RAW image processing utilities with aggressive tone mapping and vibranc
 Addresses the "dull RAW" problem by applying proper tone curves and enhanced processing.
 """
 
+import logging
 import os
 from typing import Any, Dict, Optional
 
 import numpy as np
-import rawpy
 from PIL import Image, ImageEnhance
 
+from pro_photo_processor.io.file_operations import load_image_rgb
+from pro_photo_processor.raw import raw_cache
+from pro_photo_processor.raw.raw_processing import (
+    demosaic_algorithm,
+    load_embedded_preview,
+    open_raw,
+    read_raw_metadata,
+    use_half_size,
+)
+
+logger = logging.getLogger(__name__)
+
+# Lowercase extensions handled by the enhanced RAW loaders
+RAW_EXTENSIONS = (".nef", ".raw", ".cr2", ".arw", ".dng", ".orf")
+
 
 def is_raw_file(file_path: str) -> bool:
     """Check if file is a RAW format that needs special handling"""
-    raw_extensions = (
-        ".nef",
-        ".NEF",
-        ".raw",
-        ".RAW",
-        ".cr2",
-        ".CR2",
-        ".arw",
-        ".ARW",
-        ".dng",
-        ".DNG",
-        ".orf",
-        ".ORF",
-    )
-    return file_path.lower().endswith(raw_extensions)
+    return file_path.lower().endswith(RAW_EXTENSIONS)
 
 
 def apply_tone_curve(img_array: np.ndarray) -> np.ndarray:
@@ -87,12 +88,14 @@ def enhance_raw_vibrancy(image: Image.Image) -> Image.Image:
     brightness_enhancer = ImageEnhance.Brightness(image)
     image = brightness_enhancer.enhance(1.08)  # 8% brighter (increased)
 
-    print("🎨 Applied aggressive vibrancy enhancement for RAW file")
+    logger.info("🎨 Applied aggressive vibrancy enhancement for RAW file")
     return image
 
 
 def load_raw_image_enhanced(
-    file_path: str, apply_enhancements: bool = True
+    file_path: str,
+    apply_enhancements: bool = True,
+    target_pixels: Optional[int] = None,
 ) -> Image.Image:
     """
     Load a RAW image file with enhanced processing to avoid the "dull" look.
@@ -100,23 +103,33 @@ def load_raw_image_enhanced(
     Args:
         file_path (str): Path to the RAW image file
         apply_enhancements (bool): Whether to apply additional enhancements
+        target_pixels (int, optional): Output pixel count the caller will
+            resize to; lets large RAWs decode at half size
 
     Returns:
         PIL.Image: Enhanced RGB image that looks vibrant and sharp
     """
     try:
-        print(
-            f"📸 Loading RAW file with enhanced processing: {os.path.basename(file_path)}"
+        logger.info(
+            "📸 Loading RAW file with enhanced processing: %s",
+            os.path.basename(file_path),
         )
+        key = raw_cache.cache_key(
+            file_path, f"enhanced|{apply_enhancements}|{target_pixels}"
+        )
+        cached = raw_cache.load_cached(key)
+        if cached is not None:
+            return cached
 
-        with rawpy.imread(file_path) as raw:
+        with open_raw(file_path) as raw:
             # Use compatible processing parameters for maximum enhancement
             rgb_array = raw.postprocess(
                 output_bps=8,  # 8-bit output
                 # Allow auto-brightness (helps with exposure)
                 no_auto_bright=False,
                 use_camera_wb=True,  # Use camera white balance
-                half_size=False,  # Full resolution
+                # Full resolution unless the output is much smaller
+                half_size=use_half_size(raw, target_pixels),
                 four_color_rgb=False,  # Standard 3-color processing
                 bright=1.4,  # 40% brighter (increased from 1.3)
                 # Positive exposure shift (increased from 0.3)
@@ -129,97 +142,124 @@ def load_raw_image_enhanced(
         if apply_enhancements:
             rgb_array = apply_tone_curve(rgb_array)
 
-        # Ensure proper data type
-        if rgb_array.dtype != np.uint8:
-            # Normalize to 0-255 range if needed
-            rgb_array = np.clip(rgb_array, 0, 255).astype(np.uint8)
-
-        # Convert to PIL Image
+        # Convert to PIL Image. It holds its own copy of the pixels, so drop
+        # the array before the enhancement passes allocate theirs
         img = Image.fromarray(rgb_array)
+        del rgb_array
 
         # Apply additional vibrancy enhancements for RAW files
         if apply_enhancements:
             img = enhance_raw_vibrancy(img)
+        if key is not None:
+            # np.asarray copies every pixel, so only build it when caching
+            raw_cache.store(key, np.asarray(img))
 
-        print(f"✅ Enhanced RAW file loaded: {img.size[0]}x{img.size[1]} pixels")
+        logger.info("✅ Enhanced RAW file loaded: %dx%d pixels", *img.size)
         return img
 
     except Exception as e:
-        print(f"❌ Error loading RAW file {file_path}: {e}")
-        print("💡 Falling back to standard RAW processing...")
+        logger.error("❌ Error loading RAW file %s: %s", file_path, e)
+        logger.warning("💡 Falling back to standard RAW processing...")
         # Fallback to standard processing
-        return load_raw_image_standard(file_path)
+        return load_raw_image_standard(file_path, target_pixels)
 
 
-def load_raw_image_standard(file_path: str) -> Image.Image:
+def load_raw_image_standard(
+    file_path: str, target_pixels: Optional[int] = None, fast: bool = False
+) -> Image.Image:
     """
     Standard RAW processing (your original method) as fallback.
 
     Args:
         file_path (str): Path to the RAW image file
+        target_pixels (int, optional): Output pixel count the caller will
+            resize to; an embedded preview that large is used directly,
+            otherwise large RAWs decode at half size
+        fast (bool): Demosaic bilinearly for output that is downscaled anyway
 
     Returns:
         PIL.Image: Standard processed RGB image
     """
     try:
-        with rawpy.imread(file_path) as raw:
+        key = raw_cache.cache_key(file_path, f"standard|{target_pixels}|{fast}")
+        cached = raw_cache.load_cached(key)
+        if cached is not None:
+            return cached
+
+        with open_raw(file_path) as raw:
+            # The camera's own preview is the original look, with no demosaic
+            if target_pixels:
+                preview = load_embedded_preview(raw, target_pixels)
+                if preview is not None:
+                    return preview
+
             rgb_array = raw.postprocess(
                 output_bps=8,
                 no_auto_bright=True,
                 use_camera_wb=True,
-                half_size=False,
+                half_size=use_half_size(raw, target_pixels),
                 four_color_rgb=False,
+                demosaic_algorithm=demosaic_algorithm(fast),
             )
 
-        if rgb_array.dtype != np.uint8:
-            rgb_array = ((rgb_array / rgb_array.max()) * 255).astype(np.uint8)
-
-        img = Image.fromarray(rgb_array)
-        return img
+        raw_cache.store(key, rgb_array)
+        return Image.fromarray(rgb_array)
 
     except Exception as e:
-        print(f"❌ Standard RAW processing also failed: {e}")
+        logger.error("❌ Standard RAW processing also failed: %s", e)
         # Final fallback to PIL
         try:
             return Image.open(file_path).convert("RGB")
         except Exception as pil_error:
-            print(f"❌ PIL fallback also failed: {pil_error}")
+            logger.error("❌ PIL fallback also failed: %s", pil_error)
             raise
 
 
-def load_image_smart_enhanced(file_path: str) -> Image.Image:
+def load_image_smart_enhanced(
+    file_path: str, target_pixels: Optional[int] = None
+) -> Image.Image:
     """
     Smart image loading with enhanced RAW processing.
 
     Args:
         file_path (str): Path to the image file
+        target_pixels (int, optional): Output pixel count the caller will
+            resize to; large JPEGs and RAWs then decode at a reduced scale
 
     Returns:
         PIL.Image: Loaded image in RGB format (enhanced if RAW)
     """
     if is_raw_file(file_path):
-        return load_raw_image_enhanced(file_path, apply_enhancements=True)
+        return load_raw_image_enhanced(
+            file_path, apply_enhancements=True, target_pixels=target_pixels
+        )
     else:
-        # Use PIL for standard formats (JPG, PNG, etc.)
-        return Image.open(file_path).convert("RGB")
+        # Standard formats (JPG, PNG, etc.)
+        return load_image_rgb(file_path, target_pixels)
 
 
-def load_image_basic(file_path: str) -> Image.Image:
+def load_image_basic(
+    file_path: str, target_pixels: Optional[int] = None, fast: bool = False
+) -> Image.Image:
     """
     Basic image loading with minimal RAW processing for watermark-only mode.
     Preserves the original camera look as much as possible.
 
     Args:
         file_path (str): Path to the image file
+        target_pixels (int, optional): Output pixel count the caller will
+            resize to; lets large JPEGs and RAWs decode at a reduced scale
+        fast (bool): Demosaic RAWs bilinearly (see load_raw_image_standard)
 
     Returns:
         PIL.Image: Loaded image in RGB format (minimal processing if RAW)
     """
     if is_raw_file(file_path):
-        return load_raw_image_standard(file_path)  # Use standard, not enhanced
+        # Use standard, not enhanced
+        return load_raw_image_standard(file_path, target_pixels, fast=fast)
     else:
-        # Use PIL for standard formats (JPG, PNG, etc.)
-        return Image.open(file_path).convert("RGB")
+        # Standard formats (JPG, PNG, etc.)
+        return load_image_rgb(file_path, target_pixels)
 
 
 def compare_raw_processing_methods(file_path: str) -> Optional[Dict[str, Image.Image]]:
@@ -233,32 +273,34 @@ def compare_raw_processing_methods(file_path: str) -> Optional[Dict[str, Image.I
         dict: Dictionary with different processed versions
     """
     if not is_raw_file(file_path):
-        print("❌ File is not a RAW format")
+        logger.error("❌ File is not a RAW format")
         return None
 
-    print(f"🔍 Comparing RAW processing methods for: {os.path.basename(file_path)}")
+    logger.info(
+        "🔍 Comparing RAW processing methods for: %s", os.path.basename(file_path)
+    )
 
     results = {}
 
     try:
         # Method 1: Conservative (original)
         results["conservative"] = load_raw_image_standard(file_path)
-        print("✅ Conservative processing completed")
+        logger.info("✅ Conservative processing completed")
 
         # Method 2: Enhanced (new)
         results["enhanced"] = load_raw_image_enhanced(
             file_path, apply_enhancements=True
         )
-        print("✅ Enhanced processing completed")
+        logger.info("✅ Enhanced processing completed")
 
         # Method 3: Enhanced without post-processing
         results["enhanced_no_post"] = load_raw_image_enhanced(
             file_path, apply_enhancements=False
         )
-        print("✅ Enhanced (no post) processing completed")
+        logger.info("✅ Enhanced (no post) processing completed")
 
     except Exception as e:
-        print(f"❌ Error in comparison: {e}")
+        logger.error("❌ Error in comparison: %s", e)
         return None
 
     return results
@@ -275,17 +317,7 @@ def get_raw_metadata(file_path: str) -> Optional[Dict[str, Any]]:
         Optional[Dict[str, Any]]: Metadata dictionary or None if error
     """
     try:
-        with rawpy.imread(file_path) as raw:
-            metadata = {
-                "camera_make": getattr(raw, "camera_make", "Unknown"),
-                "camera_model": getattr(raw, "camera_model", "Unknown"),
-                "raw_size": getattr(raw, "raw_image_visible", None),
-                "color_desc": getattr(raw, "color_desc", None),
-                "num_colors": getattr(raw, "num_colors", None),
-                "white_balance": getattr(raw, "camera_whitebalance", None),
-                "iso_speed": getattr(raw, "other", {}).get("iso_speed", "Unknown"),
-            }
-            return metadata
+        return read_raw_metadata(file_path)
     except Exception as e:
-        print(f"❌ Error reading RAW metadata: {e}")
+        logger.error("❌ Error reading RAW metadata: %s", e)
         return None
@@ -11,6 +11,17 @@ def test_fix_image_orientation_identity():
     assert result.size == (10, 10)
 
 
+def test_fix_image_orientation_rotates_from_exif():
+    img = Image.new("RGB", (20, 10), color="red")
+    img.putpixel((0, 0), (0, 0, 255))
+    exif = img.getexif()
+    exif[0x0112] = 6  # Rotated 90° clockwise by the camera
+    img.info["exif"] = exif.tobytes()
+    result = image_processing.fix_image_orientation(img)
+    assert result.size == (10, 20)
+    assert result.getpixel((9, 0)) == (0, 0, 255)
+
+
 def test_resize_and_crop():
     img = Image.new("RGB", (100, 50), color="blue")
     target_size = (40, 40)
@@ -37,6 +48,22 @@ def test_add_watermark_runs(monkeypatch):
     assert result.size == (100, 100)
 
 
+def test_add_watermark_only_touches_bottom_left(monkeypatch, tmp_path):
+    import pro_photo_processor.config.config as config_mod
+
+    logo_path = tmp_path / "logo.png"
+    Image.new("RGBA", (20, 10), (0, 0, 0, 255)).save(logo_path)
+    monkeypatch.setattr(config_mod, "DEFAULT_LOGO_PATH", str(logo_path))
+    img = Image.new("RGB", (200, 100), color=(100, 150, 200))
+    result = image_processing.add_watermark(img, watermark_opacity=1.0)
+    assert result.mode == "RGB"
+    assert result.size == (200, 100)
+    # Logo is 30x15 at (20, 65); the rest of the image is unchanged
+    assert result.getpixel((30, 70)) == (0, 0, 0)
+    assert result.getpixel((150, 20)) == (100, 150, 200)
+    assert img.getpixel((30, 70)) == (100, 150, 200)
+
+
 def test_analyze_and_adjust_lighting():
     img = Image.new("RGB", (50, 50), color=(50, 50, 50))  # Dark image
     result = image_processing.analyze_and_adjust_lighting(img)
@@ -44,6 +71,17 @@ def test_analyze_and_adjust_lighting():
     assert result.size == (50, 50)
 
 
+def test_analyze_and_adjust_lighting_judges_exposure_on_luminance(monkeypatch):
+    gammas = []
+    gamma_lut = image_processing._gamma_lut
+    monkeypatch.setattr(
+        image_processing, "_gamma_lut", lambda g: gammas.append(g) or gamma_lut(g)
+    )
+    # No red at all, but cyan is bright (luma ~179): darken, don't brighten
+    image_processing.analyze_and_adjust_lighting(Image.new("RGB", (8, 8), "cyan"))
+    assert gammas == [1.2]
+
+
 def test_calculate_target_size():
     total_pixels = 40000
     aspect_ratio = 1.0
@@ -0,0 +1,70 @@
+import numpy as np
+from PIL import Image
+from pro_photo_processor.core import image_utils
+
+
+def test_build_tone_lut_identity():
+    lut = image_utils.build_tone_lut(1.0, 1.0, 1.0)
+    assert lut.dtype == np.uint8
+    assert np.array_equal(lut, np.arange(256, dtype=np.uint8))
+
+
+def test_build_tone_lut_brightens_midtones():
+    lut = image_utils.build_tone_lut(1.2, 1.0, 0.8)
+    assert lut[128] > 128
+    assert np.all(np.diff(lut.astype(int)) >= 0)
+
+
+def test_build_tone_lut_brightness_is_linear_exposure():
+    # Doubling exposure raises an encoded value by 2 ** (1 / 2.2), not 2
+    lut = image_utils.build_tone_lut(2.0, 1.0, 1.0)
+    assert lut[100] == round(100 * 2 ** (1 / 2.2))
+    assert lut[200] == 255
+
+
+def test_enhance_color_matches_pil():
+    from PIL import ImageEnhance
+
+    rng = np.random.default_rng(1)
+    img = Image.fromarray(rng.integers(0, 256, size=(20, 30, 3), dtype=np.uint8))
+    expected = np.asarray(ImageEnhance.Color(img).enhance(1.3)).astype(int)
+    result = np.asarray(image_utils.enhance_color(img, 1.3)).astype(int)
+    assert np.abs(result - expected).max() <= 1
+
+
+def test_analyze_and_adjust_lighting_enhanced(monkeypatch):
+    import pro_photo_processor.config.config as config_mod
+
+    monkeypatch.setattr(config_mod, "PORTRAIT_MODE", False)
+    monkeypatch.setattr(config_mod, "ENABLE_BRIGHTNESS_AUTO_ADJUST", True)
+    monkeypatch.setattr(config_mod, "ENABLE_CONTRAST_AUTO_ADJUST", True)
+    monkeypatch.setattr(config_mod, "ENABLE_GAMMA_CORRECTION", True)
+    img = Image.new("RGB", (40, 30), color=(40, 40, 40))  # Dark image
+    result = image_utils.analyze_and_adjust_lighting(img)
+    assert result.size == (40, 30)
+    assert np.asarray(result).mean() > 40
+
+
+def test_resize_and_crop_arr():
+    arr = np.zeros((50, 100, 3), dtype=np.uint8)
+    result = image_utils.resize_and_crop_arr(arr, (40, 40))
+    assert result.shape == (40, 40, 3)
+
+
+def test_resize_and_crop_pil_fallback(monkeypatch):
+    monkeypatch.setattr(image_utils, "cv2", None)
+    img = Image.new("RGB", (100, 50), color="blue")
+    assert image_utils.resize_and_crop(img, (40, 40)).size == (40, 40)
+
+
+def test_resize_and_crop_keeps_palette_mode():
+    img = Image.new("P", (100, 50), color=3)
+    result = image_utils.resize_and_crop(img, (40, 40))
+    assert result.mode == "P"
+    assert result.size == (40, 40)
+
+
+def test_fix_image_orientation_reads_exif_tag():
+    img = Image.new("RGB", (30, 10), color="red")
+    img.getexif()[0x0112] = 6
+    assert image_utils.fix_image_orientation(img).size == (10, 30)
@@ -1,10 +1,12 @@
 # Standard library imports
 import os
 import sys
+import types
 import zipfile
 
 # Third-party imports
 import pytest
+from PIL import Image
 
 # Local imports
 from pro_photo_processor.io import file_operations
@@ -125,6 +127,17 @@ def test_extract_zip_if_needed_with_folder(tmp_path):
     assert is_temp is False
 
 
+def test_extract_zip_if_needed_with_non_zip_named_zip(tmp_path):
+    """
+    Test a .zip path without ZIP signature or directory is not extracted.
+    """
+    fake = tmp_path / "not_really.zip"
+    fake.write_bytes(b"just text")
+    result_path, is_temp = file_operations.extract_zip_if_needed(str(fake))
+    assert result_path == str(fake)
+    assert is_temp is False
+
+
 def test_cleanup_temp_directory_removes_dir(tmp_path):
     """
     Test cleanup_temp_directory removes the specified directory.
@@ -161,3 +174,116 @@ def test_create_zip_archive(tmp_path, sample_image_file):
         assert any(img_name in f for f in zf.namelist()), (
             "Image not found in zip archive."
         )
+
+
+def test_load_image_rgb_keeps_exif(tmp_path):
+    """
+    Test load_image_rgb returns an RGB image and preserves the JPEG EXIF block.
+    """
+    img_path = tmp_path / "oriented.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new("L", (16, 8), color=128).save(img_path, exif=exif)
+    img = file_operations.load_image_rgb(str(img_path))
+    assert img.mode == "RGB"
+    assert img.size == (16, 8)
+    assert img.getexif().get(0x0112) == 6
+    assert file_operations.decode_jpeg(str(img_path)).shape == (8, 16, 3)
+
+
+def test_load_image_rgb_drafts_large_jpeg(tmp_path):
+    """
+    Test load_image_rgb decodes a JPEG far above the target at a reduced scale.
+    """
+    img_path = tmp_path / "large.jpg"
+    Image.new("RGB", (800, 600), color=(10, 120, 200)).save(img_path)
+    img = file_operations.load_image_rgb(str(img_path), target_pixels=32 * 24)
+    assert img.mode == "RGB"
+    assert img.size == (100, 75)  # 1/8 scale, still >= 2x the 32x24 target
+    full = file_operations.load_image_rgb(str(img_path), target_pixels=400 * 300)
+    assert full.size == (800, 600)
+
+
+def test_load_image_rgb_broken_turbojpeg_falls_back(monkeypatch, tmp_path):
+    """
+    Test a libjpeg-turbo that fails to load is only tried on first decode,
+    and JPEGs then decode through PIL.
+    """
+
+    def broken_turbojpeg():
+        raise OSError("libturbojpeg not found")
+
+    monkeypatch.setitem(
+        sys.modules, "turbojpeg", types.SimpleNamespace(TurboJPEG=broken_turbojpeg)
+    )
+    file_operations._load_turbo_jpeg.cache_clear()
+    try:
+        img_path = tmp_path / "photo.jpg"
+        Image.new("RGB", (16, 8), color=(200, 10, 10)).save(img_path)
+        img = file_operations.load_image_rgb(str(img_path))
+        assert img.size == (16, 8)
+        assert file_operations._load_turbo_jpeg() is None
+    finally:
+        file_operations._load_turbo_jpeg.cache_clear()
+
+
+def test_get_image_files_from_directory_nested(tmp_path):
+    """
+    Test get_image_files_from_directory walks subdirectories and returns relative paths.
+    """
+    (tmp_path / "day1" / "raw").mkdir(parents=True)
+    (tmp_path / "day1" / "a.JPG").write_bytes(b"x")
+    (tmp_path / "day1" / "raw" / "b.nef").write_bytes(b"x")
+    (tmp_path / "notes.txt").write_text("skip")
+    files = file_operations.get_image_files_from_directory(str(tmp_path))
+    assert sorted(rel for _, rel in files) == [
+        os.path.join("day1", "a.JPG"),
+        os.path.join("day1", "raw", "b.nef"),
+    ]
+    assert all(os.path.isfile(full) for full, _ in files)
+
+
+def test_get_image_files_from_directory_not_a_directory(tmp_path, sample_image_file):
+    """
+    Test a file or missing path lists no images instead of raising, like os.walk.
+    """
+    assert file_operations.get_image_files_from_directory(sample_image_file) == []
+    missing = str(tmp_path / "missing")
+    assert file_operations.get_image_files_from_directory(missing) == []
+
+
+def test_extract_zip_if_needed_nested_members(tmp_path):
+    """
+    Test extract_zip_if_needed extracts every image member, keeping folders.
+    """
+    zip_path = tmp_path / "batch.zip"
+    names = [f"set{i % 3}/sub/img{i}.jpg" for i in range(12)] + ["../evil.png"]
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        for name in names:
+            zf.writestr(name, b"data " + name.encode())
+        zf.writestr("readme.txt", b"skip")
+    temp_dir, is_temp = file_operations.extract_zip_if_needed(str(zip_path))
+    assert is_temp is True
+    files = file_operations.get_image_files_from_directory(temp_dir)
+    assert len(files) == 13
+    with open(os.path.join(temp_dir, "set1", "sub", "img4.jpg"), "rb") as f:
+        assert f.read() == b"data set1/sub/img4.jpg"
+    assert os.path.exists(os.path.join(temp_dir, "evil.png"))
+    file_operations.cleanup_temp_directory(temp_dir)
+
+
+def test_create_zip_archive_stores_jpegs(tmp_path):
+    """
+    Test create_zip_archive stores JPEGs uncompressed and deflates other files.
+    """
+    output_folder = tmp_path / "output"
+    output_folder.mkdir()
+    (output_folder / "a.jpg").write_bytes(b"jpeg" * 100)
+    (output_folder / "notes.log").write_text("log line\n" * 100)
+    zip_path = file_operations.create_zip_archive(
+        str(output_folder), str(tmp_path), "unit"
+    )
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        infos = {os.path.basename(info.filename): info for info in zf.infolist()}
+    assert infos["a.jpg"].compress_type == zipfile.ZIP_STORED
+    assert infos["notes.log"].compress_type == zipfile.ZIP_DEFLATED
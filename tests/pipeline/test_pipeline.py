@@ -1,5 +1,16 @@
+# Standard library imports
+import os
 import tempfile
-from pro_photo_processor.pipeline import ImageProcessingPipeline
+import types
+import zipfile
+
+# Third-party imports
+import pytest
+from PIL import Image
+
+# Local imports
+from pro_photo_processor import pipeline as pipeline_module
+from pro_photo_processor.pipeline import ImageProcessingPipeline, _save_jpeg
 from pro_photo_processor.config import config
 from pro_photo_processor.io import file_operations
 from pro_photo_processor.core import image_processing
@@ -32,3 +43,172 @@ def test_process_images_empty(monkeypatch):
             file_operations, "get_image_files_from_directory", lambda d: []
         )
         pipeline.process_images("fake_input", mode="resize_only")
+
+
+def _make_config(output_dir):
+    return types.SimpleNamespace(
+        DEFAULT_OUTPUT_DIR=output_dir,
+        RESOLUTIONS={"tiny": 32 * 24},
+        ENABLE_WATERMARK=False,
+        WATERMARK_OPACITY=0.9,
+        WATERMARK_SCALE=0.15,
+    )
+
+
+@pytest.fixture
+def input_dir(tmp_path):
+    """Create an input folder with one JPEG and one PNG"""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for name in ("a.jpg", "b.png"):
+        Image.new("RGB", (64, 48), color="orange").save(input_dir / name)
+    return input_dir
+
+
+def test_process_images_resize_only_with_workers(tmp_path, input_dir):
+    output_dir = tmp_path / "output"
+    pipeline = ImageProcessingPipeline(
+        _make_config(str(output_dir)), file_operations, image_processing, workers=2
+    )
+    pipeline.process_images(str(input_dir), mode="resize_only")
+
+    (project_dir,) = [p for p in output_dir.iterdir() if p.is_dir()]
+    output_folder = project_dir / "processed_photos_tiny_res"
+    assert sorted(os.listdir(output_folder)) == ["a_res.jpg", "b_res.jpg"]
+    with Image.open(output_folder / "a_res.jpg") as result:
+        assert result.size == (32, 24)
+    with zipfile.ZipFile(project_dir / "processed_photos_tiny_res.zip") as zf:
+        assert len(zf.namelist()) == 2
+
+
+def test_process_with_preset_with_workers(tmp_path, input_dir):
+    output_dir = tmp_path / "output"
+    pipeline = ImageProcessingPipeline(
+        _make_config(str(output_dir)), file_operations, image_processing, workers=2
+    )
+    pipeline.process_with_preset(str(input_dir), "portrait_subtle")
+
+    (project_dir,) = [p for p in output_dir.iterdir() if p.is_dir()]
+    output_folder = project_dir / "processed_photos_tiny_portrait_subtle"
+    assert sorted(os.listdir(output_folder)) == ["a_sub.jpg", "b_sub.jpg"]
+
+
+def test_process_with_custom_preset(tmp_path, input_dir):
+    output_dir = tmp_path / "output"
+    pipeline = ImageProcessingPipeline(
+        _make_config(str(output_dir)), file_operations, image_processing
+    )
+    pipeline.process_with_custom_preset(str(input_dir), {"exposure": 0.1})
+
+    (project_dir,) = [p for p in output_dir.iterdir() if p.is_dir()]
+    output_folder = project_dir / "processed_photos_tiny_custom"
+    assert len(os.listdir(output_folder)) == 2
+
+
+def test_process_images_saves_every_resolution(tmp_path, input_dir):
+    output_dir = tmp_path / "output"
+    config = _make_config(str(output_dir))
+    config.RESOLUTIONS = {"tiny": 32 * 24, "small": 48 * 36}
+    pipeline = ImageProcessingPipeline(config, file_operations, image_processing)
+    pipeline.process_images(str(input_dir), mode="resize_only")
+
+    (project_dir,) = [p for p in output_dir.iterdir() if p.is_dir()]
+    for label, size in (("tiny", (32, 24)), ("small", (48, 36))):
+        output_folder = project_dir / f"processed_photos_{label}_res"
+        with Image.open(output_folder / "b_res.jpg") as result:
+            assert result.size == size
+        assert (project_dir / f"processed_photos_{label}_res.zip").exists()
+
+
+def test_process_images_does_not_upscale(tmp_path, input_dir):
+    output_dir = tmp_path / "output"
+    config = _make_config(str(output_dir))
+    config.RESOLUTIONS = {"huge": 640 * 480, "tiny": 32 * 24}
+    pipeline = ImageProcessingPipeline(config, file_operations, image_processing)
+    pipeline.process_images(str(input_dir), mode="resize_only")
+
+    (project_dir,) = [p for p in output_dir.iterdir() if p.is_dir()]
+    for label, size in (("huge", (64, 48)), ("tiny", (32, 24))):
+        output_folder = project_dir / f"processed_photos_{label}_res"
+        with Image.open(output_folder / "b_res.jpg") as result:
+            assert result.size == size
+
+
+def test_save_jpeg_failure_leaves_no_file(tmp_path):
+    output_path = str(tmp_path / "out.jpg")
+    # JPEG cannot store an alpha channel, so the encode fails midway
+    with pytest.raises(OSError):
+        _save_jpeg(Image.new("RGBA", (8, 8)), output_path, optimize=False)
+    assert os.listdir(tmp_path) == []
+
+    _save_jpeg(Image.new("RGB", (8, 8)), output_path, optimize=False)
+    assert os.listdir(tmp_path) == ["out.jpg"]
+
+
+class _FakeVipsImage:
+    """Records the libvips calls made by the resize_only fast path"""
+
+    calls: list = []
+
+    def __init__(self, width, height):
+        self.width, self.height, self.bands = width, height, 3
+
+    @classmethod
+    def new_from_file(cls, path, access=None):
+        return cls(400, 300)
+
+    def autorot(self):
+        return self
+
+    def resize(self, scale, vscale=None, kernel=None):
+        self.calls.append(("resize", kernel))
+        return _FakeVipsImage(round(self.width * scale), round(self.height * vscale))
+
+    def colourspace(self, space):
+        return self
+
+    def jpegsave(self, path, **kwargs):
+        self.calls.append(("jpegsave", (self.width, self.height), kwargs))
+        with open(path, "wb") as f:
+            f.write(b"jpeg")
+
+
+def test_process_image_file_resize_only_vips(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        pipeline_module, "pyvips", types.SimpleNamespace(Image=_FakeVipsImage)
+    )
+    monkeypatch.setattr(_FakeVipsImage, "calls", [])
+    small, large = tmp_path / "small", tmp_path / "large"
+    small.mkdir()
+    large.mkdir()
+    options = {
+        "enable_watermark": True,
+        "watermark_opacity": 0.5,
+        "watermark_scale": 0.1,
+        "high_compression": False,
+        "resample": Image.Resampling.BICUBIC,
+    }
+    pipeline_module._process_image_file(
+        image_processing,
+        str(tmp_path / "a.jpg"),
+        "resize_only",
+        "r",
+        [(400 * 300 * 4, str(large)), (200 * 150, str(small))],
+        options,
+    )
+    # No upscale for the larger target; the smaller one uses the configured kernel
+    assert _FakeVipsImage.calls == [
+        (
+            "jpegsave",
+            (400, 300),
+            {"Q": 90, "optimize_coding": False, "subsample_mode": "on", "strip": True},
+        ),
+        ("resize", "cubic"),
+        (
+            "jpegsave",
+            (200, 150),
+            {"Q": 90, "optimize_coding": False, "subsample_mode": "on", "strip": True},
+        ),
+    ]
+    assert os.listdir(large) == ["a_r.jpg"]
+    assert os.listdir(small) == ["a_r.jpg"]
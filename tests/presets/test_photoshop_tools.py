@@ -0,0 +1,22 @@
+import numpy as np
+from PIL import Image
+from pro_photo_processor.presets import photoshop_tools
+
+
+def test_scale_midtones_matches_numpy_fallback():
+    rng = np.random.default_rng(0)
+    arr = rng.integers(0, 256, size=(32, 48, 3), dtype=np.uint8)
+    expected = arr.copy()
+    photoshop_tools._scale_midtones_numpy(expected, 160, 200, 0.97)
+    photoshop_tools._scale_midtones(arr, 160, 200, 0.97)
+    assert np.array_equal(arr, expected)
+
+
+def test_midtone_protection_darkens_sand():
+    arr = np.full((60, 60, 3), (190, 175, 150), dtype=np.uint8)
+    arr[:10] = 30  # Dark strip outside the target range
+    enhancer = photoshop_tools.PhotoshopStyleEnhancer(Image.fromarray(arr))
+    result = np.asarray(enhancer.apply_midtone_protection().get_result())
+    assert tuple(result[30, 30]) == (184, 169, 145)
+    assert tuple(result[0, 0]) == (30, 30, 30)
+    assert enhancer.history[-1].startswith("Midtone Protection: Applied")
@@ -0,0 +1,165 @@
+import io
+import types
+
+import rawpy
+from PIL import Image
+
+from pro_photo_processor.raw import raw_processing
+
+
+def _fake_raw(preview, flip=0):
+    def extract_thumb():
+        if preview is None:
+            raise rawpy.LibRawNoThumbnailError()
+        buffer = io.BytesIO()
+        preview.save(buffer, "JPEG")
+        return types.SimpleNamespace(
+            format=rawpy.ThumbFormat.JPEG, data=buffer.getvalue()
+        )
+
+    return types.SimpleNamespace(
+        extract_thumb=extract_thumb, sizes=types.SimpleNamespace(flip=flip)
+    )
+
+
+def test_load_embedded_preview_rotates_by_flip():
+    raw = _fake_raw(Image.new("RGB", (60, 40), "green"), flip=6)
+    img = raw_processing.load_embedded_preview(raw, target_pixels=30 * 20)
+    assert img is not None
+    assert img.mode == "RGB"
+    assert img.size == (40, 60)
+
+
+def test_load_embedded_preview_rejects_small_or_missing_preview():
+    small = _fake_raw(Image.new("RGB", (60, 40), "green"))
+    assert raw_processing.load_embedded_preview(small, target_pixels=100 * 100) is None
+    missing = _fake_raw(None)
+    assert raw_processing.load_embedded_preview(missing, target_pixels=10) is None
+
+
+def test_open_raw_reads_small_files_from_a_buffer(monkeypatch, tmp_path):
+    path = tmp_path / "shot.nef"
+    path.write_bytes(b"raw data")
+    opened = []
+    monkeypatch.setattr(raw_processing.rawpy, "imread", opened.append)
+    raw_processing.open_raw(str(path))
+    raw_processing.open_raw(str(path), use_buffer=False)
+    assert not isinstance(opened[0], str)
+    assert opened[1] == str(path)
+
+
+def test_use_half_size_only_when_quarter_covers_target():
+    raw = types.SimpleNamespace(sizes=types.SimpleNamespace(width=6000, height=4000))
+    assert raw_processing.use_half_size(raw, 3000 * 2000)
+    assert not raw_processing.use_half_size(raw, 3840 * 2160)
+    assert not raw_processing.use_half_size(raw, None)
+
+
+def test_raw_cache_round_trip_and_eviction(monkeypatch, tmp_path):
+    import numpy as np
+
+    from pro_photo_processor.config import config
+    from pro_photo_processor.raw import raw_cache
+
+    monkeypatch.setattr(config, "RAW_CACHE_ENABLED", True)
+    monkeypatch.setattr(config, "RAW_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(config, "RAW_CACHE_MAX_FILES", 1)
+    path = tmp_path / "shot.nef"
+    path.write_bytes(b"raw data")
+    key = raw_cache.cache_key(str(path), "basic|None")
+    assert raw_cache.load_cached(key) is None
+    raw_cache.store(key, np.asarray(Image.new("RGB", (4, 3), "red")))
+    cached = raw_cache.load_cached(key)
+    assert cached is not None
+    assert cached.size == (4, 3)
+    assert cached.getpixel((0, 0)) == (255, 0, 0)
+    # Different settings use another entry, and the older one is evicted
+    other = raw_cache.cache_key(str(path), "basic|100")
+    assert other != key
+    raw_cache.store(other, np.zeros((2, 2, 3), np.uint8))
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+
+def test_read_raw_header_tags_reads_tiff_ifds_only(tmp_path):
+    from PIL import ExifTags
+
+    exif = Image.Exif()
+    exif[ExifTags.Base.Make] = "NIKON CORPORATION\x00"
+    exif[ExifTags.Base.Model] = "NIKON D850"
+    exif.get_ifd(ExifTags.IFD.Exif)[ExifTags.Base.ISOSpeedRatings] = 400
+    path = tmp_path / "shot.nef"
+    # A bare TIFF header with IFDs and no sensor data, as at the start of a NEF
+    path.write_bytes(exif.tobytes()[len(b"Exif\x00\x00") :])
+    assert raw_processing.read_raw_header_tags(str(path)) == {
+        "camera_make": "NIKON CORPORATION",
+        "camera_model": "NIKON D850",
+        "iso_speed": 400,
+    }
+    other = tmp_path / "shot.raf"
+    other.write_bytes(b"FUJIFILMCCD-RAW ")
+    assert raw_processing.read_raw_header_tags(str(other)) == {}
+
+
+def test_load_raw_image_fast_uses_bilinear_demosaic(monkeypatch, tmp_path):
+    import contextlib
+
+    import numpy as np
+
+    from pro_photo_processor.config import config
+
+    monkeypatch.setattr(config, "RAW_CACHE_ENABLED", False)
+    calls = []
+
+    def postprocess(**params):
+        calls.append(params["demosaic_algorithm"])
+        return np.zeros((4, 6, 3), np.uint8)
+
+    raw = types.SimpleNamespace(
+        postprocess=postprocess, sizes=types.SimpleNamespace(width=6, height=4)
+    )
+    monkeypatch.setattr(
+        raw_processing, "open_raw", lambda *args: contextlib.nullcontext(raw)
+    )
+    path = str(tmp_path / "shot.nef")
+    assert raw_processing.load_raw_image(path).size == (6, 4)
+    raw_processing.load_raw_image(path, fast=True)
+    assert calls == [None, rawpy.DemosaicAlgorithm.LINEAR]
+
+
+def test_enhanced_cache_is_keyed_by_apply_enhancements(monkeypatch, tmp_path):
+    import contextlib
+
+    import numpy as np
+
+    from pro_photo_processor.config import config
+    from pro_photo_processor.raw import raw_processing_enhanced
+
+    monkeypatch.setattr(config, "RAW_CACHE_ENABLED", True)
+    monkeypatch.setattr(config, "RAW_CACHE_DIR", str(tmp_path / "cache"))
+    calls = []
+
+    def postprocess(**params):
+        calls.append(params)
+        return np.full((4, 6, 3), 100, np.uint8)
+
+    raw = types.SimpleNamespace(
+        postprocess=postprocess, sizes=types.SimpleNamespace(width=6, height=4)
+    )
+    monkeypatch.setattr(
+        raw_processing_enhanced, "open_raw", lambda *args: contextlib.nullcontext(raw)
+    )
+    path = tmp_path / "shot.nef"
+    path.write_bytes(b"raw data")
+
+    enhanced = raw_processing_enhanced.load_raw_image_enhanced(str(path))
+    assert enhanced.getpixel((0, 0)) != (100, 100, 100)
+    # The cached enhanced decode is not served to the unenhanced setting
+    plain = raw_processing_enhanced.load_raw_image_enhanced(
+        str(path), apply_enhancements=False
+    )
+    assert len(calls) == 2
+    assert plain.getpixel((0, 0)) == (100, 100, 100)
+    # Each setting hits its own entry on a re-run
+    again = raw_processing_enhanced.load_raw_image_enhanced(str(path))
+    assert len(calls) == 2
+    assert again.tobytes() == enhanced.tobytes()